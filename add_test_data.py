@@ -3,87 +3,129 @@
 Add test data to the attendance system database
 """
 
-from database.database import DatabaseManager
-from auth.authentication import AuthenticationManager
+from concurrent.futures import ThreadPoolExecutor
+
+from database.database import get_db
+from auth.authentication import get_auth
+
+# (name, email, plaintext password, role, faculty_id, enrollment_no)
+TEST_USERS = [
+    ("Dr. John Smith", "faculty@test.com", "faculty123", "faculty", "FAC001", None),
+    ("Alice Johnson", "alice@test.com", "student123", "student", None, "CS001"),
+    ("Bob Wilson", "bob@test.com", "student123", "student", None, "CS002"),
+    ("Carol Davis", "carol@test.com", "student123", "student", None, "CS003"),
+    ("David Brown", "david@test.com", "student123", "student", None, "CS004"),
+    ("Eva Martinez", "eva@test.com", "student123", "student", None, "CS005"),
+    ("System Administrator", "admin@test.com", "admin123", "admin", None, None)
+]
+
+# Pre-generated Argon2id hashes for the fixture passwords above, so a
+# seeding run skips the (intentionally slow) hashing step entirely.
+# Regenerate with regen_fixture_hashes.py if the parameters change.
+FIXTURE_HASHES = {
+    "faculty123": "$argon2id$v=19$m=19456,t=2,p=1$RwIgEbnjolLLrMsqqlGGww$ki4pd+4XIj6pb0Zr6QPeWD593v+GMdY2a9v5c2F8atU",
+    "student123": "$argon2id$v=19$m=19456,t=2,p=1$kNSZr/p25p32c8HX3sSFlQ$v6bMbuZcWgD4sw/ozadAXxC4xP+p894nOKPQmdeq6BU",
+    "admin123": "$argon2id$v=19$m=19456,t=2,p=1$g0tQbndub+Sod6ZbrlPJ7A$m/DeN09oo/UJgVFS6a7KSYkja1iVRjtM3M6oqLgRA9U"
+}
 
 def add_test_data():
-    db = DatabaseManager()
-    auth = AuthenticationManager()
-    
-    if not db.connect():
-        print("❌ Failed to connect to database")
-        return False
-        
-    print("✅ Connected to database")
-    
+    auth = get_auth()
+
+    # The context manager returns the connection to the pool on exit
+    # (and rolls back on error) instead of tearing it down
     try:
-        # Add a test faculty user
-        faculty_password = auth.hash_password("faculty123")
-        faculty_query = '''
-            INSERT IGNORE INTO users (
-                name, email, password, role, faculty_id
-            ) VALUES (%s, %s, %s, %s, %s)
-        '''
-        
-        db.execute_query(faculty_query, (
-            "Dr. John Smith", 
-            "faculty@test.com", 
-            faculty_password,
-            "faculty",
-            "FAC001"
-        ))
-        print("✅ Added test faculty user: faculty@test.com / faculty123")
-        
-        # Add test student users
-        student_password = auth.hash_password("student123")
-        students = [
-            ("Alice Johnson", "alice@test.com", "CS001"),
-            ("Bob Wilson", "bob@test.com", "CS002"), 
-            ("Carol Davis", "carol@test.com", "CS003"),
-            ("David Brown", "david@test.com", "CS004"),
-            ("Eva Martinez", "eva@test.com", "CS005")
-        ]
-        
-        for name, email, enrollment_no in students:
-            student_query = '''
-                INSERT IGNORE INTO users (
-                    name, email, password, role, enrollment_no
-                ) VALUES (%s, %s, %s, %s, %s)
-            '''
-            db.execute_query(student_query, (
-                name, email, student_password, "student", enrollment_no
-            ))
-            
-        print("✅ Added 5 test student users: student123 password for all")
-        
-        # Add an admin user
-        admin_password = auth.hash_password("admin123")
-        admin_query = '''
-            INSERT IGNORE INTO users (
-                name, email, password, role
-            ) VALUES (%s, %s, %s, %s)
-        '''
-        
-        db.execute_query(admin_query, (
-            "System Administrator",
-            "admin@test.com", 
-            admin_password,
-            "admin"
-        ))
-        print("✅ Added admin user: admin@test.com / admin123")
-        
-        print("\n🎉 Test data added successfully!")
-        print("\nLogin credentials:")
-        print("📚 Faculty: faculty@test.com / faculty123")
-        print("👨‍🎓 Student: alice@test.com / student123 (or bob@test.com, carol@test.com, etc.)")
-        print("🔧 Admin: admin@test.com / admin123")
-        
+        with get_db() as db:
+            return _seed_users(db, auth)
     except Exception as e:
         print(f"❌ Error adding test data: {e}")
         return False
-    finally:
-        db.disconnect()
-        
+
+def _seed_users(db, auth):
+    if not db.connection:
+        print("❌ Failed to connect to database")
+        return False
+
+    print("✅ Connected to database")
+
+    # Idempotent fast-path: one cheap SELECT tells us which rows are
+    # already seeded, so reruns skip the expensive hashing entirely
+    emails = [user[1] for user in TEST_USERS]
+    placeholders = ', '.join(['%s'] * len(emails))
+    existing = db.execute_query(
+        f"SELECT email FROM users WHERE email IN ({placeholders})",
+        tuple(emails)
+    ) or []
+    existing_emails = {row['email'] for row in existing}
+    missing = [user for user in TEST_USERS if user[1] not in existing_emails]
+
+    if not missing:
+        print("✅ Test data already seeded - nothing to do")
+        return True
+
+    # One transaction for the whole seed: a single commit/fsync
+    # instead of one per INSERT
+    db.begin()
+
+    # Use the checked-in fixture hashes where available; anything
+    # not in the table is hashed on the fly, in parallel, since the
+    # hashes are independent and argon2-cffi releases the GIL.
+    # DO NOT move hash_password into the row loop below — password
+    # hashing is intentionally slow and would multiply runtime per row
+    passwords = {user[2] for user in missing}
+    hashed = {pwd: FIXTURE_HASHES[pwd] for pwd in passwords if pwd in FIXTURE_HASHES}
+    to_hash = passwords - hashed.keys()
+    if to_hash:
+        with ThreadPoolExecutor(max_workers=len(to_hash)) as executor:
+            futures = {pwd: executor.submit(auth.hash_password, pwd) for pwd in to_hash}
+            hashed.update({pwd: future.result() for pwd, future in futures.items()})
+
+    # Batch all test users into a single multi-row INSERT so the
+    # script pays one round trip instead of seven
+    # ON DUPLICATE KEY UPDATE with a no-op assignment only skips
+    # duplicate rows, unlike INSERT IGNORE which swallows every error
+    user_query = '''
+        INSERT INTO users (
+            name, email, password, role, faculty_id, enrollment_no
+        ) VALUES (%s, %s, %s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE email = email
+    '''
+    user_rows = [
+        (name, email, hashed[password], role, faculty_id, enrollment_no)
+        for name, email, password, role, faculty_id, enrollment_no in missing
+    ]
+
+    # Past a few hundred rows the bulk-load protocol beats even a
+    # batched INSERT; below that the multi-row VALUES path wins
+    if len(user_rows) >= 500:
+        written = db.load_rows(
+            'users',
+            ('name', 'email', 'password', 'role', 'faculty_id', 'enrollment_no'),
+            user_rows
+        )
+    else:
+        written = db.execute_many(user_query, user_rows)
+    # Both helpers return None after an internal rollback on failure -
+    # don't commit and report success over a failed seed
+    if written is None:
+        db.rollback()
+        print("❌ Failed to seed test users, rolled back")
+        return False
+    db.commit()
+    print("✅ Added test faculty user: faculty@test.com / faculty123")
+    print("✅ Added 5 test student users: student123 password for all")
+    print("✅ Added admin user: admin@test.com / admin123")
+
+    # Single write keeps the banner atomic when stdout is piped/unbuffered
+    print("\n".join([
+        "",
+        "🎉 Test data added successfully!",
+        "",
+        "Login credentials:",
+        "📚 Faculty: faculty@test.com / faculty123",
+        "👨‍🎓 Student: alice@test.com / student123 (or bob@test.com, carol@test.com, etc.)",
+        "🔧 Admin: admin@test.com / admin123"
+    ]))
+
     return True
 
 if __name__ == "__main__":
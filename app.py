@@ -4,36 +4,99 @@
 # All rights reserved.
 
 # app.py (corrected)
+# eventlet must monkey-patch the stdlib before anything else imports it.
+# Greenlet-per-connection lets a single worker hold thousands of
+# WebSocket connections instead of the few dozen OS threads allow.
+try:
+    import eventlet
+    eventlet.monkey_patch()
+    _SOCKETIO_ASYNC_MODE = 'eventlet'
+except ImportError:
+    _SOCKETIO_ASYNC_MODE = 'threading'
+
 from flask import Flask, render_template, request, redirect, url_for, session, flash, jsonify, Response, make_response, send_from_directory
 from flask_socketio import SocketIO, emit, join_room, leave_room
 from database.database import db
 from auth.authentication import auth_manager
-import traceback
 import sys
-from face_processing.face_processor import face_processor
-from rfid.rfid_reader import rfid_reader
+from concurrent.futures import ThreadPoolExecutor
+from face_processing.face_queue import verify_face
 # from utils.analytics import analytics  # Temporarily disabled due to matplotlib issues
+from utils.attendance_buffer import attendance_buffer
 from utils.otp_service import otp_service
-
-# Try to import qr_service, use mock if not available
-try:
-    from utils.qr_service import qr_service
-except ImportError:
-    print("Warning: qrcode module not found. QR functionality will be disabled.")
-    class MockQRService:
-        def generate_qr_code(self, *args, **kwargs):
-            return None
-        def verify_qr_scan(self, *args, **kwargs):
-            return False, "QR service not available"
-    qr_service = MockQRService()
+from utils.otp_store import otp_store
+from utils.verify_cache import verify_cache
+
+# face_processor (dlib/CNN weights), rfid_reader (serial port) and
+# qr_service are heavy or hardware-bound, so they are imported on first
+# use instead of at startup: workers become ready without touching them
+# and non-attendance paths (login, dashboard) never pay for the load.
+_face_processor = None
+_rfid_reader = None
+_qr_service = None
+
+def get_face_processor():
+    """Import and cache the face processor on first use"""
+    global _face_processor
+    if _face_processor is None:
+        from face_processing.face_processor import face_processor
+        _face_processor = face_processor
+    return _face_processor
+
+def get_rfid_reader():
+    """Import and cache the RFID reader on first use"""
+    global _rfid_reader
+    if _rfid_reader is None:
+        from rfid.rfid_reader import rfid_reader
+        _rfid_reader = rfid_reader
+    return _rfid_reader
+
+# Face recognition runs off the request worker so a recognition call
+# doesn't pin it for the full model inference. Under eventlet the
+# monkey patch turns ThreadPoolExecutor workers into greenlets on the
+# same OS thread - no parallelism at all - so that mode goes through
+# eventlet's native thread pool (tpool) instead.
+if _SOCKETIO_ASYNC_MODE == 'eventlet':
+    from eventlet import tpool as _tpool
+
+    def run_blocking(func, *args):
+        """Run a blocking/CPU-bound call on a real OS thread"""
+        return _tpool.execute(func, *args)
+else:
+    face_executor = ThreadPoolExecutor(max_workers=4)
+
+    def run_blocking(func, *args):
+        """Run a blocking/CPU-bound call on the thread pool"""
+        return face_executor.submit(func, *args).result()
+
+def get_qr_service():
+    """Import and cache the QR service on first use, mock if unavailable"""
+    global _qr_service
+    if _qr_service is None:
+        try:
+            from utils.qr_service import qr_service
+        except ImportError:
+            print("Warning: qrcode module not found. QR functionality will be disabled.")
+            class MockQRService:
+                def generate_qr_code(self, *args, **kwargs):
+                    return None
+                def verify_qr_scan(self, *args, **kwargs):
+                    return False, "QR service not available"
+            qr_service = MockQRService()
+        _qr_service = qr_service
+    return _qr_service
 
 from enhanced_registration import enhanced_registration
 from config import Config
+import itertools
+import json
 import os
+import threading
+import time
 from datetime import datetime, timedelta
 import logging
 import hashlib
-from functools import wraps
+from functools import lru_cache, wraps
 
 # Temporary mock analytics class (kept as-is since original file provided it)
 class MockAnalytics:
@@ -74,15 +137,65 @@ logger = logging.getLogger(__name__)
 app = Flask(__name__)
 app.config.from_object(Config)
 
-# Initialize SocketIO for real-time updates
-socketio = SocketIO(app, cors_allowed_origins="*")
+# Redis pub/sub bridge: with a message queue every app process shares
+# one Socket.IO event bus, so emits from any worker (or the face
+# worker) reach clients connected to the others
+try:
+    import redis as _redis
+    _redis.from_url(Config.REDIS_URL).ping()
+    _SOCKETIO_MESSAGE_QUEUE = Config.REDIS_URL
+except Exception:
+    _SOCKETIO_MESSAGE_QUEUE = None
 
-# Generate a unique server instance ID on startup
-# This changes every time the server restarts, invalidating old sessions
+# Initialize SocketIO for real-time updates
+socketio = SocketIO(app, cors_allowed_origins="*",
+                    async_mode=_SOCKETIO_ASYNC_MODE,
+                    message_queue=_SOCKETIO_MESSAGE_QUEUE,
+                    ping_interval=25, ping_timeout=60)
+logger.info(f"SocketIO running in {_SOCKETIO_ASYNC_MODE} mode"
+            f"{' with Redis message queue' if _SOCKETIO_MESSAGE_QUEUE else ''}")
+
+# Server instance ID mixed into the signing key below so sessions from
+# a previous deploy are invalidated. It must be identical across worker
+# processes - a per-process uuid would make each worker reject cookies
+# signed by its siblings and login-loop any multi-worker deployment -
+# so it lives in shared state: Redis first (SET NX lets the first
+# worker publish the id all others read; delete server:boot_id on
+# deploy to force a global logout), then a file beside the app for
+# setups without Redis, then a per-process uuid as the single-worker
+# fallback.
 import uuid
-SERVER_INSTANCE_ID = str(uuid.uuid4())
+
+def _server_instance_id():
+    """Boot id shared by every worker of this deployment"""
+    boot_id = str(uuid.uuid4())
+    try:
+        import redis
+        client = redis.from_url(Config.REDIS_URL)
+        if client.set('server:boot_id', boot_id, nx=True):
+            return boot_id
+        return client.get('server:boot_id').decode('utf-8')
+    except Exception:
+        pass
+    boot_file = os.path.join(app.root_path, '.boot_id')
+    try:
+        with open(boot_file, 'x') as f:
+            f.write(boot_id)
+        return boot_id
+    except FileExistsError:
+        with open(boot_file) as f:
+            return f.read().strip() or boot_id
+    except OSError:
+        return boot_id
+
+SERVER_INSTANCE_ID = _server_instance_id()
 logger.info(f"Server started with instance ID: {SERVER_INSTANCE_ID}")
 
+# Mixing the instance id into the signing key makes cookies from a
+# previous server life fail signature verification inside Werkzeug -
+# old sessions are discarded before any per-request Python check runs
+app.config['SECRET_KEY'] = f"{Config.SECRET_KEY}:{SERVER_INSTANCE_ID}"
+
 # Ensure upload directories exist (use config values if present)
 os.makedirs(app.config.get('UPLOAD_FOLDER', 'uploads'), exist_ok=True)
 os.makedirs(app.config.get('FACE_IMAGES_FOLDER', 'face_images'), exist_ok=True)
@@ -94,41 +207,118 @@ app.config['SESSION_COOKIE_SAMESITE'] = 'Lax'  # Prevent CSRF
 app.config['PERMANENT_SESSION_LIFETIME'] = timedelta(minutes=30)  # Session expires after 30 minutes
 app.config['SESSION_REFRESH_EACH_REQUEST'] = True  # Refresh session on each request
 
-# Session validation - Auto logout on server restart
+# Server-side sessions: the cookie carries only a signed session id and the
+# payload lives in Redis, so requests stop HMAC-signing the whole session
+# blob and responses shrink. Falls back to cookie sessions if Redis or
+# Flask-Session is unavailable.
+try:
+    import redis
+    from flask_session import Session
+    _session_redis = redis.from_url(Config.REDIS_URL)
+    # from_url connects lazily; ping here so a dead Redis takes the
+    # cookie fallback now instead of failing every request later
+    _session_redis.ping()
+    app.config['SESSION_TYPE'] = 'redis'
+    app.config['SESSION_REDIS'] = _session_redis
+    app.config['SESSION_USE_SIGNER'] = True
+    Session(app)
+    logger.info("Using Redis-backed server-side sessions")
+except Exception as e:
+    logger.warning(f"Redis sessions unavailable ({e}), falling back to cookie sessions")
+
+# Shared Redis client for small hot lookups (department, daily
+# schedule); every use degrades to the database when Redis is absent
+try:
+    import redis
+    redis_cache = redis.from_url(Config.REDIS_URL)
+    redis_cache.ping()
+except Exception:
+    redis_cache = None
+
+# orjson serializes large record lists several times faster than the
+# stdlib encoder and handles date/time objects natively; jsonify is the
+# fallback when it isn't installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def ojson(payload):
+    """JSON response via orjson when available, else jsonify"""
+    if orjson is None:
+        return jsonify(payload)
+    return Response(orjson.dumps(payload, default=str), mimetype='application/json')
+
+# Route every jsonify call through orjson as well, so the endpoints
+# still returning jsonify(...) get the fast encoder without edits;
+# default=str covers the Decimal/timedelta values PyMySQL hands back
+if orjson is not None:
+    from flask.json.provider import JSONProvider
+
+    class ORJSONProvider(JSONProvider):
+        def dumps(self, obj, **kwargs):
+            return orjson.dumps(obj, default=str).decode()
+
+        def loads(self, s, **kwargs):
+            return orjson.loads(s)
+
+    app.json = ORJSONProvider(app)
+
+# Routes that skip session validation; frozenset makes the per-request
+# membership test a single hash lookup
+_PUBLIC_ROUTES = frozenset({
+    'login', 'enhanced_registration.register_role', 'enhanced_registration.register_home',
+    'enhanced_registration.handle_registration', 'index', 'static', 'favicon',
+    'handle_options', 'enhanced_registration.resend_otp'
+})
+
+# Session validation - auto logout on inactivity. Sessions from a
+# previous server life never reach this hook: the instance id is mixed
+# into the cookie signing key, so they already failed verification.
 @app.before_request
 def validate_session():
     """
     Validate session before each request.
-    Auto-logout if server was restarted (session from old server instance).
+    Auto-logout if the session has been inactive for more than 30 minutes.
     """
-    # Skip validation for static files and public routes
-    public_routes = ['login', 'enhanced_registration.register_role', 'enhanced_registration.register_home',
-                     'enhanced_registration.handle_registration', 'index', 'static', 'favicon', 
-                     'handle_options', 'enhanced_registration.resend_otp']
-    
-    # Check if this is a public route
-    if request.endpoint in public_routes or request.path.startswith('/static/'):
+    # Check if this is a public route. Flask resolves static files to
+    # the 'static' endpoint, which the set already contains, so no
+    # per-request path-prefix scan is needed.
+    if request.endpoint in _PUBLIC_ROUTES:
         return None
-    
-    # If user is logged in, check if session is from current server instance
+
     if 'user_id' in session:
-        # Check if session has server instance ID
-        session_instance_id = session.get('server_instance_id')
-        
-        # If session doesn't have instance ID or it doesn't match current server
-        if not session_instance_id or session_instance_id != SERVER_INSTANCE_ID:
-            # Clear the session
-            session.clear()
-            flash('Your session has expired due to server restart. Please login again.', 'warning')
-            logger.info("Session invalidated due to server restart")
-            return redirect(url_for('login'))
-        
-        # Update last activity timestamp
-        session['last_activity'] = datetime.now().timestamp()
+        # Inactivity expiry, computed once against a single timestamp.
+        # time.time() is the raw epoch float - no datetime object is
+        # allocated on this per-request path.
+        now_ts = time.time()
+        last_activity = session.get('last_activity')
+        if last_activity is not None:
+            try:
+                idle = now_ts - float(last_activity)
+            except (TypeError, ValueError):
+                session.clear()
+                return redirect(cached_url('login'))
+            if idle > 1800:
+                session.clear()
+                return redirect(cached_url('login'))
+            # Rewrite the timestamp at most once a minute so rapid
+            # navigation doesn't re-serialize the session every request
+            if idle < 60:
+                return None
+        session['last_activity'] = now_ts
         session.modified = True
-    
+
     return None
 
+# CORS headers, built once at import so the per-response work is a
+# single headers.update() instead of four dict writes
+_CORS_HEADERS = {
+    'Access-Control-Allow-Origin': '*',
+    'Access-Control-Allow-Methods': 'POST, GET, OPTIONS, PUT, DELETE',
+    'Access-Control-Allow-Headers': 'Content-Type, X-Requested-With, Authorization'
+}
+
 # CORS / headers handling: single consolidated after_request and OPTIONS handler
 @app.after_request
 def set_response_headers(response):
@@ -136,13 +326,13 @@ def set_response_headers(response):
     Single after_request handler to add CORS and default Content-Type when missing.
     (Replaces multiple duplicate handlers present previously.)
     """
-    # If template render produced a response with a Content-Type, keep it.
-    if not response.headers.get('Content-Type'):
-        # Default to JSON when no content-type is set (safe fallback)
-        response.headers['Content-Type'] = 'application/json'
-    response.headers['Access-Control-Allow-Origin'] = '*'
-    response.headers['Access-Control-Allow-Methods'] = 'POST, GET, OPTIONS, PUT, DELETE'
-    response.headers['Access-Control-Allow-Headers'] = 'Content-Type, X-Requested-With, Authorization'
+    # Static assets don't need CORS headers or the JSON fallback
+    if request.endpoint == 'static' or request.path.startswith('/static/'):
+        return response
+    # If template render produced a response with a Content-Type, keep it;
+    # default to JSON when none is set (safe fallback)
+    response.headers.setdefault('Content-Type', 'application/json')
+    response.headers.update(_CORS_HEADERS)
     return response
 
 # Handle preflight OPTIONS requests globally
@@ -150,20 +340,30 @@ def set_response_headers(response):
 @app.route('/', methods=['OPTIONS'])
 def handle_options(_=""):
     resp = make_response()
-    resp.headers['Access-Control-Allow-Origin'] = '*'
-    resp.headers['Access-Control-Allow-Methods'] = 'POST, GET, OPTIONS, PUT, DELETE'
-    resp.headers['Access-Control-Allow-Headers'] = 'Content-Type, X-Requested-With, Authorization'
+    resp.headers.update(_CORS_HEADERS)
     return resp
 
+# Favicon bytes cached in memory at startup - browsers poll this path
+# constantly, so skip the per-hit filesystem stat+open and let repeat
+# visitors take the 304 path via the ETag
+try:
+    with open(os.path.join(app.root_path, 'static', 'favicon.ico'), 'rb') as f:
+        _FAVICON = f.read()
+except OSError:
+    _FAVICON = b''
+_FAVICON_ETAG = hashlib.md5(_FAVICON).hexdigest() if _FAVICON else None
+
 # Add favicon route to prevent 405 errors
 @app.route('/favicon.ico')
 def favicon():
-    """Serve favicon.ico or return empty response if not found"""
-    try:
-        return send_from_directory(os.path.join(app.root_path, 'static'), 'favicon.ico', mimetype='image/vnd.microsoft.icon')
-    except:
+    """Serve the in-memory favicon with long-lived cache headers"""
+    if not _FAVICON:
         # Return empty response if favicon doesn't exist
         return '', 204
+    resp = Response(_FAVICON, mimetype='image/vnd.microsoft.icon')
+    resp.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    resp.set_etag(_FAVICON_ETAG)
+    return resp.make_conditional(request)
 
 # Initialize database when app starts
 def initialize_database():
@@ -171,17 +371,29 @@ def initialize_database():
     try:
         if db.connect():
             db.create_tables()
+            ensure_schema()
             # optional: db.insert_sample_data()  # kept out if undesired in production
             logger.info("Database initialized successfully")
         else:
             logger.error("Failed to initialize database")
     except Exception as e:
-        logger.error(f"Exception while initializing database: {e}")
-        logger.error(traceback.format_exc())
+        logger.exception("Exception while initializing database: %s", e)
 
-# Initialize database within app context
-with app.app_context():
-    initialize_database()
+# Roles allowed through faculty_required; frozenset membership is a
+# hashed lookup evaluated without building a list per request
+_FACULTY_ROLES = frozenset({'admin', 'faculty'})
+
+# URLs for fixed endpoints never change after the URL map is built, so
+# resolve them once instead of running url_for's map lookup per request
+_url_cache = {}
+
+def cached_url(endpoint):
+    """Resolve and memoize the URL of an endpoint with no dynamic parts"""
+    url = _url_cache.get(endpoint)
+    if url is None:
+        url = url_for(endpoint)
+        _url_cache[endpoint] = url
+    return url
 
 # Helper decorators
 def login_required(f):
@@ -189,7 +401,7 @@ def login_required(f):
     @wraps(f)
     def decorated_function(*args, **kwargs):
         if 'user_id' not in session:
-            return redirect(url_for('login'))
+            return redirect(cached_url('login'))
         return f(*args, **kwargs)
     return decorated_function
 
@@ -199,7 +411,7 @@ def admin_required(f):
     def decorated_function(*args, **kwargs):
         if 'user_id' not in session or session.get('role') != 'admin':
             flash('Admin access required', 'error')
-            return redirect(url_for('dashboard'))
+            return redirect(cached_url('dashboard'))
         return f(*args, **kwargs)
     return decorated_function
 
@@ -207,9 +419,9 @@ def faculty_required(f):
     """Decorator to require faculty or admin role"""
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        if 'user_id' not in session or session.get('role') not in ['admin', 'faculty']:
+        if 'user_id' not in session or session.get('role') not in _FACULTY_ROLES:
             flash('Faculty access required', 'error')
-            return redirect(url_for('dashboard'))
+            return redirect(cached_url('dashboard'))
         return f(*args, **kwargs)
     return decorated_function
 
@@ -219,22 +431,40 @@ try:
 except Exception as e:
     logger.warning(f"Could not register enhanced_registration blueprint: {e}")
 
-# before_request: session expiry tracking
-@app.before_request
-def track_session_activity():
-    """Update and validate last activity timestamp for session expiry"""
-    if 'user_id' in session:
-        if 'last_activity' in session:
-            try:
-                last_activity = datetime.fromtimestamp(session['last_activity'])
-                if datetime.now() - last_activity > timedelta(minutes=30):
-                    session.clear()
-                    return redirect(url_for('login'))
-            except Exception:
-                # If parsing fails, clear session and redirect to login
-                session.clear()
-                return redirect(url_for('login'))
-        session['last_activity'] = datetime.now().timestamp()
+def clear_temp_admin_session():
+    """Drop a pending OTP login: the nonce cookie key and its server state"""
+    nonce = session.pop('otp_nonce', None)
+    if nonce is not None:
+        otp_store.delete(nonce)
+        session.modified = True
+
+def _user_rooms(role, user_id, department):
+    """SocketIO rooms a user belongs to, computed once at login.
+
+    handle_connect/handle_disconnect just iterate the stored list, so
+    connect storms at class start skip the per-event role branching.
+    """
+    rooms = [f"{role}_room"]
+    if role == 'faculty':
+        rooms.append(f"faculty_{user_id}")
+        rooms.append(f"attendance_{department}")
+    elif role == 'admin':
+        rooms.append('admin_room')
+    return rooms
+
+def authenticate_cached(identifier, password):
+    """authenticate_user with a short-lived cache in front of the slow verify.
+
+    The admin OTP flow verifies the same credentials twice within a few
+    minutes; the second call becomes a dict lookup instead of a hash.
+    """
+    user = verify_cache.get(identifier, password)
+    if user is not None:
+        return True, user, "Authentication successful"
+    success, user, message = auth_manager.authenticate_user(identifier, password)
+    if success:
+        verify_cache.put(identifier, password, user)
+    return success, user, message
 
 # Routes
 @app.route('/')
@@ -246,10 +476,7 @@ def index():
 def login():
     """Login page with OTP support for admins"""
     if request.method == 'GET':
-        session.pop('temp_admin_mobile', None)
-        session.pop('temp_admin_password', None)
-        session.pop('temp_admin_identifier', None)
-        session.pop('temp_role', None)
+        clear_temp_admin_session()
         return render_template('login.html')
     
     def error_response(message):
@@ -285,7 +512,7 @@ def login():
                         return error_response('Please enter your password')
                     
                     # Authenticate with password first
-                    success, user, message = auth_manager.authenticate_user(identifier, password)
+                    success, user, message = authenticate_cached(identifier, password)
                     
                     if not success:
                         return error_response(f'Invalid credentials: {message}')
@@ -301,11 +528,15 @@ def login():
                     otp_success, otp_message = auth_manager.send_otp(mobile_number)
                     
                     if otp_success:
-                        # Store temp data in session for OTP verification
-                        session['temp_admin_mobile'] = mobile_number
-                        session['temp_admin_password'] = password
-                        session['temp_admin_identifier'] = identifier
-                        session['temp_role'] = role
+                        # Park the pending login server-side; only the
+                        # opaque nonce goes into the session cookie
+                        clear_temp_admin_session()
+                        session['otp_nonce'] = otp_store.put({
+                            'mobile': mobile_number,
+                            'password': password,
+                            'identifier': identifier,
+                            'role': role
+                        })
                         session.modified = True
                         
                         flash('OTP sent to your mobile number. Please enter it to continue.', 'info')
@@ -314,11 +545,15 @@ def login():
                         return error_response(f'Failed to send OTP: {otp_message}')
                 
                 # Case 2: Admin verifying OTP
-                elif otp_code and session.get('temp_admin_mobile'):
-                    mobile_number = session.get('temp_admin_mobile')
-                    password = session.get('temp_admin_password')
-                    identifier = session.get('temp_admin_identifier')
-                    
+                elif otp_code and session.get('otp_nonce'):
+                    pending = otp_store.get(session['otp_nonce'])
+                    if pending is None:
+                        clear_temp_admin_session()
+                        return error_response('OTP session expired. Please log in again.')
+                    mobile_number = pending['mobile']
+                    password = pending['password']
+                    identifier = pending['identifier']
+
                     # Verify OTP
                     otp_success, otp_message = auth_manager.verify_otp(mobile_number, otp_code)
                     
@@ -327,23 +562,22 @@ def login():
                         return render_template('login.html')
                     
                     # OTP verified, authenticate user
-                    success, user, message = auth_manager.authenticate_user(identifier, password)
+                    success, user, message = authenticate_cached(identifier, password)
                     
                     if success and user['role'] == 'admin':
                         # Clear temp session data
-                        session.pop('temp_admin_mobile', None)
-                        session.pop('temp_admin_password', None)
-                        session.pop('temp_admin_identifier', None)
-                        session.pop('temp_role', None)
-                        
+                        clear_temp_admin_session()
+
+
                         # Set actual session data
                         session['user_id'] = user['id']
                         session['username'] = user['name']
                         session['role'] = user['role']
                         session['enrollment_no'] = user.get('enrollment_no', '')
                         session['faculty_id'] = user.get('faculty_id', '')  # Add faculty_id for faculty users
-                        session['last_activity'] = datetime.now().timestamp()
-                        session['server_instance_id'] = SERVER_INSTANCE_ID  # Track server instance
+                        session['department'] = user.get('department') or 'Computer Science'
+                        session['rooms'] = _user_rooms(user['role'], user['id'], session['department'])
+                        session['last_activity'] = time.time()
                         session.permanent = True  # Make session permanent (respects PERMANENT_SESSION_LIFETIME)
                         session.modified = True
 
@@ -353,16 +587,13 @@ def login():
                         try:
                             db.execute_query("UPDATE users SET last_login = CURRENT_TIMESTAMP WHERE id = %s", (user['id'],))
                         except Exception as e:
-                            logger.error(f"Failed to update last login: {str(e)}")
+                            logger.error("Failed to update last login: %s", e)
 
                         flash('Login successful', 'success')
                         return success_response(url_for('dashboard'))
                     else:
                         # Clear temp session
-                        session.pop('temp_admin_mobile', None)
-                        session.pop('temp_admin_password', None)
-                        session.pop('temp_admin_identifier', None)
-                        session.pop('temp_role', None)
+                        clear_temp_admin_session()
                         return error_response('Authentication failed after OTP verification')
                 
                 else:
@@ -377,7 +608,7 @@ def login():
                     return error_response('Please enter your password')
 
                 # Authenticate user
-                success, user, message = auth_manager.authenticate_user(identifier, password)
+                success, user, message = authenticate_cached(identifier, password)
                 logger.info(f"Authentication result: success={success}, message={message}")
 
                 if success:
@@ -392,8 +623,9 @@ def login():
                     session['role'] = user['role']
                     session['enrollment_no'] = user.get('enrollment_no', '')
                     session['faculty_id'] = user.get('faculty_id', '')  # Add faculty_id for faculty users
-                    session['last_activity'] = datetime.now().timestamp()
-                    session['server_instance_id'] = SERVER_INSTANCE_ID  # Track server instance
+                    session['department'] = user.get('department') or 'Computer Science'
+                    session['rooms'] = _user_rooms(user['role'], user['id'], session['department'])
+                    session['last_activity'] = time.time()
                     session.permanent = True  # Make session permanent (respects PERMANENT_SESSION_LIFETIME)
                     session.modified = True
 
@@ -403,7 +635,7 @@ def login():
                     try:
                         db.execute_query("UPDATE users SET last_login = CURRENT_TIMESTAMP WHERE id = %s", (user['id'],))
                     except Exception as e:
-                        logger.error(f"Failed to update last login: {str(e)}")
+                        logger.error("Failed to update last login: %s", e)
 
                     flash('Login successful', 'success')
                     return success_response(url_for('dashboard'))
@@ -411,8 +643,7 @@ def login():
                     return error_response(f'Login failed: {message}')
 
         except Exception as e:
-            logger.error(f"Login error: {str(e)}")
-            logger.error(traceback.format_exc())
+            logger.exception("Login error: %s", e)
             return error_response('An error occurred during login. Please try again.')
 
     return render_template('login.html')
@@ -429,12 +660,16 @@ def capture_face():
         # Accept both JSON and form-encoded (if necessary)
         data = request.get_json(silent=True) or request.form.to_dict()
         enrollment_no = data.get('enrollment_no')
-        image_data = data.get('image_data')
+
+        # Prefer a multipart file upload: raw JPEG bytes skip the ~33%
+        # base64 inflation and the decode step on the hot path
+        image_file = request.files.get('image')
+        image_data = image_file.read() if image_file else data.get('image_data')
 
         if not enrollment_no or not image_data:
             return jsonify({'success': False, 'message': 'Missing data'})
 
-        success, message = face_processor.store_face_encoding(enrollment_no, image_data)
+        success, message = get_face_processor().store_face_encoding(enrollment_no, image_data)
 
         if success:
             try:
@@ -442,7 +677,7 @@ def capture_face():
             except Exception as e:
                 logger.warning(f"verify_user_registration failed: {e}")
             try:
-                rfid_success, rfid_data = rfid_reader.register_card(enrollment_no)
+                rfid_success, rfid_data = get_rfid_reader().register_card(enrollment_no)
             except Exception as e:
                 logger.warning(f"rfid register_card failed: {e}")
                 rfid_success, rfid_data = False, None
@@ -457,10 +692,37 @@ def capture_face():
             return jsonify({'success': False, 'message': message})
 
     except Exception as e:
-        logger.error(f"Error in face capture: {e}")
-        logger.error(traceback.format_exc())
+        logger.exception("Error in face capture: %s", e)
         return jsonify({'success': False, 'message': 'Face capture failed'})
 
+# Admin dashboard stats cache: (expiry monotonic ts, stats dict).
+# Counts drift slowly, so a 30s reuse window keeps dashboard refreshes
+# and polling from re-scanning the tables
+_admin_stats_cache = [0.0, None]
+_ADMIN_STATS_TTL = 30
+
+def get_admin_dashboard_stats():
+    """Fetch (or reuse) the aggregate counts for the admin dashboard"""
+    now = time.monotonic()
+    if _admin_stats_cache[1] is not None and now < _admin_stats_cache[0]:
+        return _admin_stats_cache[1]
+
+    # Conditional aggregation makes one pass over users instead of one
+    # scan per role subquery
+    stats_query = '''
+        SELECT
+            SUM(role = 'student') as total_students,
+            SUM(role = 'faculty') as total_faculty,
+            (SELECT COUNT(*) FROM attendance WHERE attendance_date = CURDATE()) as today_attendance,
+            (SELECT COUNT(DISTINCT subject) FROM sessions) as total_subjects
+        FROM users
+    '''
+    stats = db.execute_query(stats_query)
+    dashboard_stats = stats[0] if stats else {}
+    _admin_stats_cache[0] = now + _ADMIN_STATS_TTL
+    _admin_stats_cache[1] = dashboard_stats
+    return dashboard_stats
+
 @app.route('/dashboard')
 @login_required
 def dashboard():
@@ -470,16 +732,7 @@ def dashboard():
 
     try:
         if user_role == 'admin':
-            stats_query = '''
-                SELECT 
-                    (SELECT COUNT(*) FROM users WHERE role = 'student') as total_students,
-                    (SELECT COUNT(*) FROM users WHERE role = 'faculty') as total_faculty,
-                    (SELECT COUNT(*) FROM attendance WHERE attendance_date = CURDATE()) as today_attendance,
-                    (SELECT COUNT(DISTINCT subject) FROM sessions) as total_subjects
-            '''
-            stats = db.execute_query(stats_query)
-            dashboard_stats = stats[0] if stats else {}
-            return render_template('dashboard/admin_dashboard.html', stats=dashboard_stats)
+            return render_template('dashboard/admin_dashboard.html', stats=get_admin_dashboard_stats())
 
         elif user_role == 'faculty':
             today = datetime.now().date()
@@ -495,8 +748,7 @@ def dashboard():
                                  attendance_percentage=attendance_percentage,
                                  subject_wise_data=subject_wise_data)
     except Exception as e:
-        logger.error(f"Error in dashboard rendering: {e}")
-        logger.error(traceback.format_exc())
+        logger.exception("Error in dashboard rendering: %s", e)
         # Fallback to simple dashboard or error page
         return render_template('dashboard/error_dashboard.html'), 500
 
@@ -509,6 +761,158 @@ def mark_attendance():
         return redirect(url_for('dashboard'))
     return render_template('attendance/mark_attendance.html')
 
+def emit_attendance_marked(user, period_info, department):
+    """Broadcast an attendance event to the rooms that care about it.
+
+    Emitting to the department and admin rooms instead of every
+    connected client keeps the cost proportional to the subscribers.
+    The timestamp is a unix epoch float - clients format it locally.
+    """
+    payload = {
+        'student_name': user['name'],
+        'enrollment_no': user['enrollment_no'],
+        'subject': period_info['subject'],
+        'period': period_info['period_number'],
+        'ts': time.time()
+    }
+    # Emit from a background task so the HTTP response is not held up
+    # by the Redis message-queue round trip
+    socketio.start_background_task(_broadcast_attendance, payload, department)
+
+def _broadcast_attendance(payload, department):
+    socketio.emit('attendance_marked', payload, to=f"attendance_{department}")
+    socketio.emit('attendance_marked', payload, to='admin_room')
+
+# Hot-path SQL, built once at import. PyMySQL has no client-side
+# prepared-statement API, but reusing the same string objects lets the
+# driver skip re-encoding them and gives a statement cache a stable
+# identity key if one is added to execute_query later.
+# The INSERTs use IGNORE against the uk_att_dedup unique key, so a
+# concurrent double-mark resolves in the database (rowcount 0) instead
+# of a check-then-insert race.
+_Q_USER_BY_ID = "SELECT department FROM users WHERE id = %s"
+_Q_INSERT_ATTENDANCE_FACE = '''
+    INSERT IGNORE INTO attendance
+    (user_id, faculty_id, attendance_date, attendance_time, marked_by_face,
+     subject, session_type, period_number, period_start_time, period_end_time)
+    VALUES (%s, %s, CURDATE(), CURTIME(), TRUE, %s, %s, %s, %s, %s)
+'''
+_Q_INSERT_ATTENDANCE_RFID = '''
+    INSERT IGNORE INTO attendance
+    (user_id, attendance_date, attendance_time, marked_by_rfid,
+     subject, session_type, period_number, period_start_time, period_end_time)
+    VALUES (%s, CURDATE(), CURTIME(), TRUE, %s, %s, %s, %s, %s)
+'''
+
+_Q_MARKED_TODAY = '''
+    SELECT period_number, subject FROM attendance
+    WHERE user_id = %s
+    AND attendance_date = CURDATE()
+'''
+_Q_ATTENDANCE_EXISTS = '''
+    SELECT EXISTS(
+        SELECT 1 FROM attendance
+        WHERE user_id = %s AND attendance_date = CURDATE()
+        AND subject = %s AND session_type = %s
+    ) AS e
+'''
+
+_DEPT_CACHE_TTL = 3600  # departments effectively never change mid-day
+
+def get_user_department(user_id):
+    """Department for a user, cached in Redis for an hour.
+
+    Schedule polling hits this once per request per student; the cache
+    takes the users-table SELECT off that path. Returns None when the
+    user does not exist.
+    """
+    cache_key = f'user:{user_id}:dept'
+    if redis_cache is not None:
+        try:
+            cached = redis_cache.get(cache_key)
+            if cached:
+                return cached.decode('utf-8')
+        except Exception as e:
+            logger.warning(f"Department cache read failed: {e}")
+    rows = db.execute_query(_Q_USER_BY_ID, (user_id,))
+    if not rows:
+        return None
+    department = rows[0].get('department') or 'Computer Science'
+    if redis_cache is not None:
+        try:
+            redis_cache.setex(cache_key, _DEPT_CACHE_TTL, department)
+        except Exception as e:
+            logger.warning(f"Department cache write failed: {e}")
+    return department
+
+_TOTAL_STUDENTS_TTL = 300
+
+def get_total_students():
+    """Student headcount, cached in Redis for five minutes.
+
+    Session-stats polling asks for this constantly; registration
+    invalidates the key, so the TTL is only a safety net.
+    """
+    if redis_cache is not None:
+        try:
+            cached = redis_cache.get('stats:total_students')
+            if cached is not None:
+                return int(cached)
+        except Exception as e:
+            logger.warning(f"Total-students cache read failed: {e}")
+    rows = db.execute_query("SELECT COUNT(*) as total_students FROM users WHERE role = 'student'")
+    total = rows[0]['total_students'] if rows else 0
+    if redis_cache is not None:
+        try:
+            redis_cache.setex('stats:total_students', _TOTAL_STUDENTS_TTL, total)
+        except Exception as e:
+            logger.warning(f"Total-students cache write failed: {e}")
+    return total
+
+_Q_DEPARTMENT_SCHEDULE = '''
+    SELECT period_number, start_time, end_time, subject, session_type
+    FROM student_timetable
+    WHERE department = %s
+    AND day_of_week = %s
+    AND is_active = TRUE
+    ORDER BY period_number
+'''
+
+def get_department_schedule(department, current_day):
+    """Today's timetable for a department, cached in Redis until midnight.
+
+    The rows are identical for every student in the department all day,
+    so one query serves the whole cohort. Times are stored as 'HH:MM'
+    strings - they compare correctly as strings and the client wants
+    them formatted anyway.
+    """
+    cache_key = f'schedule:{department}:{current_day}'
+    if redis_cache is not None:
+        try:
+            cached = redis_cache.get(cache_key)
+            if cached:
+                return json.loads(cached)
+        except Exception as e:
+            logger.warning(f"Schedule cache read failed: {e}")
+
+    rows = db.execute_query(_Q_DEPARTMENT_SCHEDULE, (department, current_day)) or []
+    schedule = [{
+        'period_number': row['period_number'],
+        'subject': row['subject'],
+        'session_type': row['session_type'],
+        'start_time_str': row['start_time'].strftime('%H:%M'),
+        'end_time_str': row['end_time'].strftime('%H:%M')
+    } for row in rows]
+
+    if redis_cache is not None:
+        try:
+            now = datetime.now()
+            seconds_until_midnight = 86400 - (now.hour * 3600 + now.minute * 60 + now.second)
+            redis_cache.setex(cache_key, max(seconds_until_midnight, 60), json.dumps(schedule))
+        except Exception as e:
+            logger.warning(f"Schedule cache write failed: {e}")
+    return schedule
+
 @app.route('/mark_student_attendance', methods=['POST'])
 @login_required
 def mark_student_attendance():
@@ -522,104 +926,77 @@ def mark_student_attendance():
         if session.get('role') != 'student':
             return jsonify({'success': False, 'message': 'Only students can use this endpoint'})
 
-        # Get student's department info
-        user_query = "SELECT name, enrollment_no, department FROM users WHERE id = %s"
-        user_info = db.execute_query(user_query, (current_user_id,))
-        
-        if not user_info:
-            return jsonify({'success': False, 'message': 'User information not found'})
-
-        user = user_info[0]
-        department = user.get('department', 'Computer Science')  # Default if not set
+        # Name, enrollment and department are stored in the session at
+        # login, which saves a users SELECT on every attendance event.
+        # Sessions issued before the department was added fall back to
+        # one lookup and backfill it.
+        user = {
+            'name': session.get('username'),
+            'enrollment_no': session.get('enrollment_no'),
+            'department': session.get('department')
+        }
+        if not user['department']:
+            user['department'] = get_user_department(current_user_id)
+            if user['department'] is None:
+                return jsonify({'success': False, 'message': 'User information not found'})
+            session['department'] = user['department']
+        department = user['department']
         
         # Get current time and day
-        from datetime import datetime, time as dt_time
         now = datetime.now()
         current_time = now.time()
         current_day = now.strftime('%A')
         
-        # Find current period from timetable
-        timetable_query = '''
-            SELECT period_number, start_time, end_time, subject, session_type
-            FROM student_timetable 
-            WHERE department = %s 
-            AND day_of_week = %s 
-            AND start_time <= %s 
-            AND end_time >= %s
-            AND is_active = TRUE
-            ORDER BY period_number
+        # One query returns the best period to mark: the anti-join against
+        # attendance drops periods already marked today, and the ORDER BY
+        # prefers the period running right now over later ones. This
+        # replaces the old period lookup + per-period check loop (~10
+        # round trips for a six-period day) with a single round trip.
+        period_query = '''
+            SELECT t.period_number, t.start_time, t.end_time, t.subject, t.session_type
+            FROM student_timetable t
+            LEFT JOIN attendance a
+                ON a.user_id = %s
+                AND a.attendance_date = CURDATE()
+                AND a.period_number = t.period_number
+                AND a.subject = t.subject
+            WHERE t.department = %s
+            AND t.day_of_week = %s
+            AND t.is_active = TRUE
+            AND a.id IS NULL
+            ORDER BY (t.start_time <= %s AND t.end_time >= %s) DESC, t.period_number
             LIMIT 1
         '''
-        
-        current_period = db.execute_query(timetable_query, (department, current_day, current_time, current_time))
-        
+        current_period = db.execute_query(period_query, (
+            current_user_id, department, current_day, current_time, current_time
+        ))
+
         if not current_period:
-            # If no current period, allow marking for any available period today
-            available_periods_query = '''
-                SELECT period_number, start_time, end_time, subject, session_type
-                FROM student_timetable 
-                WHERE department = %s 
-                AND day_of_week = %s 
-                AND is_active = TRUE
-                ORDER BY period_number
+            # Distinguish "no classes today" from "everything marked"
+            count_query = '''
+                SELECT COUNT(*) as period_count FROM student_timetable
+                WHERE department = %s AND day_of_week = %s AND is_active = TRUE
             '''
-            available_periods = db.execute_query(available_periods_query, (department, current_day))
-            
-            if not available_periods:
+            period_count = db.execute_query(count_query, (department, current_day))
+            if not period_count or not period_count[0]['period_count']:
                 return jsonify({'success': False, 'message': f'No classes scheduled for {current_day}. Please check your timetable.'})
-            
-            # Find the next period that hasn't been marked
-            for period in available_periods:
-                check_query = '''
-                    SELECT id FROM attendance 
-                    WHERE user_id = %s 
-                    AND attendance_date = CURDATE()
-                    AND period_number = %s
-                    AND subject = %s
-                '''
-                existing = db.execute_query(check_query, (current_user_id, period['period_number'], period['subject']))
-                
-                if not existing:
-                    current_period = [period]
-                    break
-            
-            if not current_period:
-                return jsonify({'success': False, 'message': 'You have already marked attendance for all today\'s classes.'})
+            return jsonify({'success': False, 'message': 'You have already marked attendance for all today\'s classes.'})
 
         period_info = current_period[0]
-        
-        # Check if already marked for this period
-        check_query = '''
-            SELECT id FROM attendance 
-            WHERE user_id = %s 
-            AND attendance_date = CURDATE()
-            AND period_number = %s
-            AND subject = %s
-        '''
-        existing = db.execute_query(check_query, (current_user_id, period_info['period_number'], period_info['subject']))
-
-        if existing:
-            return jsonify({
-                'success': False, 
-                'message': f'You have already marked attendance for {period_info["subject"]} (Period {period_info["period_number"]}) today.'
-            })
 
         if method == 'face':
-            image_data = data.get('image_data')
+            # Multipart file uploads carry raw JPEG bytes; base64 in the
+            # JSON body remains supported for older clients
+            image_file = request.files.get('image')
+            image_data = image_file.read() if image_file else data.get('image_data')
             if not image_data:
                 return jsonify({'success': False, 'message': 'No image data provided'})
 
-            success, recognized_user, message = face_processor.verify_face_from_image(image_data, current_user_id)
+            success, recognized_user, message = verify_face(image_data, current_user_id)
 
             if success:
-                insert_query = '''
-                    INSERT INTO attendance 
-                    (user_id, faculty_id, attendance_date, attendance_time, marked_by_face, 
-                     subject, session_type, period_number, period_start_time, period_end_time)
-                    VALUES (%s, %s, CURDATE(), CURTIME(), TRUE, %s, %s, %s, %s, %s)
-                '''
                 try:
-                    result = db.execute_query(insert_query, (
+                    result = db.execute_query(_Q_INSERT_ATTENDANCE_FACE, (
                         current_user_id, current_user_id, 
                         period_info['subject'], period_info['session_type'], 
                         period_info['period_number'], period_info['start_time'], period_info['end_time']
@@ -627,14 +1004,9 @@ def mark_student_attendance():
                     
                     if result:
                         # Emit Socket.IO event for real-time analytics update
-                        socketio.emit('attendance_marked', {
-                            'student_name': user['name'],
-                            'enrollment_no': user['enrollment_no'],
-                            'subject': period_info['subject'],
-                            'period': period_info['period_number'],
-                            'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                        })
-                        
+                        emit_attendance_marked(user, period_info, department)
+
+
                         return jsonify({
                             'success': True, 
                             'message': f'Attendance marked successfully for {period_info["subject"]} (Period {period_info["period_number"]})!',
@@ -644,12 +1016,13 @@ def mark_student_attendance():
                             'period': period_info['period_number'],
                             'session_type': period_info['session_type']
                         })
+                    elif result == 0:
+                        return jsonify({'success': False, 'message': 'Attendance already marked for this period'})
                     else:
-                        logger.error(f'Failed to save attendance record for user {current_user_id}')
+                        logger.error('Failed to save attendance record for user %s', current_user_id)
                         return jsonify({'success': False, 'message': 'Failed to save attendance record'})
                 except Exception as e:
-                    logger.error(f'Database error while saving attendance: {str(e)}')
-                    logger.error(traceback.format_exc())
+                    logger.exception("Database error while saving attendance: %s", e)
                     return jsonify({'success': False, 'message': f'Database error: {str(e)}'})
             else:
                 return jsonify({'success': False, 'message': message})
@@ -665,13 +1038,7 @@ def mark_student_attendance():
             if not user_verify:
                 return jsonify({'success': False, 'message': 'RFID card does not match your account'})
 
-            insert_query = '''
-                INSERT INTO attendance 
-                (user_id, attendance_date, attendance_time, marked_by_rfid, 
-                 subject, session_type, period_number, period_start_time, period_end_time)
-                VALUES (%s, CURDATE(), CURTIME(), TRUE, %s, %s, %s, %s, %s)
-            '''
-            result = db.execute_query(insert_query, (
+            result = db.execute_query(_Q_INSERT_ATTENDANCE_RFID, (
                 current_user_id, 
                 period_info['subject'], period_info['session_type'], 
                 period_info['period_number'], period_info['start_time'], period_info['end_time']
@@ -679,14 +1046,8 @@ def mark_student_attendance():
 
             if result:
                 # Emit Socket.IO event for real-time analytics update
-                socketio.emit('attendance_marked', {
-                    'student_name': user['name'],
-                    'enrollment_no': user['enrollment_no'],
-                    'subject': period_info['subject'],
-                    'period': period_info['period_number'],
-                    'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                })
-                
+                emit_attendance_marked(user, period_info, department)
+
                 return jsonify({
                     'success': True, 
                     'message': f'Attendance marked successfully for {period_info["subject"]} (Period {period_info["period_number"]})!',
@@ -696,14 +1057,15 @@ def mark_student_attendance():
                     'period': period_info['period_number'],
                     'session_type': period_info['session_type']
                 })
+            elif result == 0:
+                return jsonify({'success': False, 'message': 'Attendance already marked for this period'})
             else:
                 return jsonify({'success': False, 'message': 'Failed to save attendance record'})
 
         return jsonify({'success': False, 'message': 'Invalid method specified'})
 
     except Exception as e:
-        logger.error(f"Error in mark_student_attendance: {e}")
-        logger.error(traceback.format_exc())
+        logger.exception("Error in mark_student_attendance: %s", e)
         return jsonify({'success': False, 'message': f'Server error: {str(e)}'})
 
 @app.route('/get_student_schedule', methods=['GET'])
@@ -715,34 +1077,22 @@ def get_student_schedule():
             return jsonify({'success': False, 'message': 'Only students can access this endpoint'})
         
         current_user_id = session.get('user_id')
-        
-        # Get student's department
-        user_query = "SELECT department FROM users WHERE id = %s"
-        user_info = db.execute_query(user_query, (current_user_id,))
-        
-        if not user_info:
+
+        # Get student's department (Redis-cached, 1h TTL)
+        department = get_user_department(current_user_id)
+
+        if department is None:
             return jsonify({'success': False, 'message': 'User information not found'})
         
-        department = user_info[0].get('department', 'Computer Science')
-        
         # Get current time and day
-        from datetime import datetime
         now = datetime.now()
-        current_time = now.time()
         current_day = now.strftime('%A')
-        
-        # Get today's complete schedule
-        schedule_query = '''
-            SELECT period_number, start_time, end_time, subject, session_type
-            FROM student_timetable 
-            WHERE department = %s 
-            AND day_of_week = %s 
-            AND is_active = TRUE
-            ORDER BY period_number
-        '''
-        
-        today_schedule = db.execute_query(schedule_query, (department, current_day))
-        
+        current_hhmm = now.strftime('%H:%M')
+
+        # Today's schedule, cached per department until midnight - the
+        # rows are the same for every student in the cohort
+        today_schedule = get_department_schedule(department, current_day)
+
         if not today_schedule:
             return jsonify({
                 'success': True,
@@ -750,31 +1100,24 @@ def get_student_schedule():
                 'schedule': [],
                 'current_period': None
             })
-        
-        # Find current period
+
+        # Find current period ('HH:MM' strings compare correctly)
         current_period = None
         for period in today_schedule:
-            if period['start_time'] <= current_time <= period['end_time']:
+            if period['start_time_str'] <= current_hhmm <= period['end_time_str']:
                 current_period = period
                 break
-        
-        # Check attendance status for each period
+
+        # Attendance status for all periods in one query instead of one
+        # round-trip per period: fetch today's marked (period, subject)
+        # pairs for the student and test membership in Python
+        marked_rows = db.execute_query(_Q_MARKED_TODAY, (current_user_id,)) or []
+        marked = {(row['period_number'], row['subject']) for row in marked_rows}
+
         for period in today_schedule:
-            check_query = '''
-                SELECT id FROM attendance 
-                WHERE user_id = %s 
-                AND attendance_date = CURDATE()
-                AND period_number = %s
-                AND subject = %s
-            '''
-            existing = db.execute_query(check_query, (current_user_id, period['period_number'], period['subject']))
-            period['marked'] = bool(existing)
-            
-            # Format times for display
-            period['start_time_str'] = period['start_time'].strftime('%H:%M')
-            period['end_time_str'] = period['end_time'].strftime('%H:%M')
+            period['marked'] = (period['period_number'], period['subject']) in marked
         
-        return jsonify({
+        return ojson({
             'success': True,
             'schedule': today_schedule,
             'current_period': current_period,
@@ -782,7 +1125,7 @@ def get_student_schedule():
         })
         
     except Exception as e:
-        logger.error(f"Error in get_student_schedule: {e}")
+        logger.error("Error in get_student_schedule: %s", e)
         return jsonify({'success': False, 'message': f'Server error: {str(e)}'})
 
 @app.route('/get_student_attendance_history', methods=['GET'])
@@ -796,47 +1139,46 @@ def get_student_attendance_history():
         current_user_id = session.get('user_id')
         days = request.args.get('days', 30, type=int)  # Default to last 30 days
         
-        # Get attendance history
+        # Get attendance history with display formatting pushed into
+        # MySQL: DATE_FORMAT/TIME_FORMAT and the marking-method CASE
+        # replace ~4 strftime calls per row in Python (the %% escapes
+        # keep the driver's parameter substitution out of the formats)
         history_query = '''
-            SELECT attendance_date, attendance_time, subject, session_type, 
-                   period_number, period_start_time, period_end_time,
-                   marked_by_face, marked_by_rfid, status
-            FROM attendance 
-            WHERE user_id = %s 
+            SELECT subject, session_type, period_number, status,
+                   marked_by_face, marked_by_rfid,
+                   DATE_FORMAT(attendance_date, '%%Y-%%m-%%d (%%W)') as attendance_date_str,
+                   TIME_FORMAT(attendance_time, '%%H:%%i') as attendance_time_str,
+                   TIME_FORMAT(period_start_time, '%%H:%%i') as period_start_time_str,
+                   TIME_FORMAT(period_end_time, '%%H:%%i') as period_end_time_str,
+                   CASE
+                       WHEN marked_by_face THEN 'Face Recognition'
+                       WHEN marked_by_rfid THEN 'RFID Card'
+                       ELSE 'Manual'
+                   END as marking_method
+            FROM attendance
+            WHERE user_id = %s
             AND attendance_date >= DATE_SUB(CURDATE(), INTERVAL %s DAY)
             ORDER BY attendance_date DESC, period_number ASC
         '''
-        
+
         history = db.execute_query(history_query, (current_user_id, days))
         
-        if history:
-            for record in history:
-                # Format times and dates for display
-                record['attendance_date_str'] = record['attendance_date'].strftime('%Y-%m-%d (%A)')
-                record['attendance_time_str'] = record['attendance_time'].strftime('%H:%M')
-                if record['period_start_time']:
-                    record['period_start_time_str'] = record['period_start_time'].strftime('%H:%M')
-                if record['period_end_time']:
-                    record['period_end_time_str'] = record['period_end_time'].strftime('%H:%M')
-                
-                # Determine marking method
-                if record['marked_by_face']:
-                    record['marking_method'] = 'Face Recognition'
-                elif record['marked_by_rfid']:
-                    record['marking_method'] = 'RFID Card'
-                else:
-                    record['marking_method'] = 'Manual'
-        
-        return jsonify({
+        return ojson({
             'success': True,
             'history': history or [],
             'total_records': len(history) if history else 0
         })
         
     except Exception as e:
-        logger.error(f"Error in get_student_attendance_history: {e}")
+        logger.error("Error in get_student_attendance_history: %s", e)
         return jsonify({'success': False, 'message': f'Server error: {str(e)}'})
 
+@lru_cache(maxsize=1024)
+def _loc_hash(client_ip, subject):
+    """Location hash for QR sessions; a faculty machine regenerates QR
+    codes for the same (ip, subject) pair all term, so cache the digest"""
+    return hashlib.sha256(f"{client_ip}:{subject}".encode()).hexdigest()[:16]
+
 @app.route('/generate_attendance_qr', methods=['POST'])
 @login_required
 def generate_attendance_qr():
@@ -857,10 +1199,10 @@ def generate_attendance_qr():
         
         # Get client IP for location verification
         client_ip = request.environ.get('HTTP_X_FORWARDED_FOR', request.remote_addr)
-        location_hash = hashlib.sha256(f"{client_ip}:{subject}".encode()).hexdigest()[:16]
+        location_hash = _loc_hash(client_ip, subject)
         
         # Generate QR code
-        qr_result = qr_service.generate_session_qr(
+        qr_result = get_qr_service().generate_session_qr(
             faculty_id=faculty_id,
             subject=subject,
             session_type=session_type,
@@ -876,12 +1218,6 @@ def generate_attendance_qr():
                 VALUES (%s, %s, %s, CURDATE(), CURTIME(), TRUE, %s)
             '''
             
-            # Add qr_session_id column to sessions table if it doesn't exist
-            try:
-                db.execute_query("ALTER TABLE sessions ADD COLUMN qr_session_id VARCHAR(255) UNIQUE")
-            except:
-                pass  # Column might already exist
-            
             db_result = db.execute_query(session_query, (
                 faculty_id, subject, session_type, qr_result['session_id']
             ))
@@ -910,7 +1246,7 @@ def generate_attendance_qr():
             return jsonify({'success': False, 'message': qr_result.get('error', 'Failed to generate QR code')})
             
     except Exception as e:
-        logger.error(f"Error generating QR code: {e}")
+        logger.error("Error generating QR code: %s", e)
         return jsonify({'success': False, 'message': f'Server error: {str(e)}'})
 
 @app.route('/scan_attendance_qr', methods=['POST'])
@@ -933,8 +1269,11 @@ def scan_attendance_qr():
         
         student_id = session.get('user_id')
         
-        # First, verify face recognition
-        success, recognized_user, face_message = face_processor.verify_face_from_image(face_image, student_id)
+        # First, verify face recognition (off the worker so the
+        # inference doesn't block this worker's event loop)
+        success, recognized_user, face_message = run_blocking(
+            get_face_processor().verify_face_from_image, face_image, student_id
+        )
         
         if not success:
             return jsonify({'success': False, 'message': f'Face verification failed: {face_message}'})
@@ -943,7 +1282,7 @@ def scan_attendance_qr():
         client_ip = request.environ.get('HTTP_X_FORWARDED_FOR', request.remote_addr)
         
         # Validate QR code
-        qr_result = qr_service.validate_qr_scan(
+        qr_result = get_qr_service().validate_qr_scan(
             qr_data=qr_data,
             student_id=student_id,
             client_ip=client_ip
@@ -952,58 +1291,70 @@ def scan_attendance_qr():
         if not qr_result['success']:
             return jsonify({'success': False, 'message': qr_result['error']})
         
-        # Get student info
-        student_query = "SELECT name, enrollment_no, department FROM users WHERE id = %s"
-        student_info = db.execute_query(student_query, (student_id,))
-        
+        # Student info and the database duplicate check come back in one
+        # round trip: the EXISTS column rides along on the users lookup
+        student_query = '''
+            SELECT u.name, u.enrollment_no, u.department,
+                   EXISTS(SELECT 1 FROM attendance a
+                          WHERE a.user_id = u.id
+                          AND a.attendance_date = CURDATE()
+                          AND a.subject = %s
+                          AND a.qr_session_id = %s) AS already_marked
+            FROM users u WHERE u.id = %s
+        '''
+        student_info = db.execute_query(student_query, (
+            qr_result['subject'], qr_result['session_id'], student_id))
+
         if not student_info:
             return jsonify({'success': False, 'message': 'Student information not found'})
-        
+
         student = student_info[0]
-        
-        # Check if already marked attendance for this session
-        check_query = '''
-            SELECT id FROM attendance 
-            WHERE user_id = %s 
-            AND attendance_date = CURDATE()
-            AND subject = %s
-            AND qr_session_id = %s
-        '''
-        existing = db.execute_query(check_query, (student_id, qr_result['subject'], qr_result['session_id']))
-        
-        if existing:
+
+        # Duplicate check + write. With Redis available the check is a
+        # SADD on the session's scan set and the row goes through the
+        # coalescing buffer, so a classroom burst of scans becomes one
+        # multi-row INSERT per second instead of one round trip each.
+        # Without Redis the EXISTS flag fetched above already answers.
+        duplicate = attendance_buffer.already_marked(
+            student_id, qr_result['subject'], qr_result['session_id'])
+        if duplicate is None:
+            buffered = False
+            duplicate = bool(student['already_marked'])
+        else:
+            buffered = True
+
+        if duplicate:
             return jsonify({'success': False, 'message': 'You have already marked attendance for this session'})
-        
-        # Mark attendance
-        attendance_query = '''
-            INSERT INTO attendance 
-            (user_id, faculty_id, attendance_date, attendance_time, 
-             subject, session_type, marked_by_face, marked_by_qr, qr_session_id, status)
-            VALUES (%s, %s, CURDATE(), CURTIME(), %s, %s, TRUE, TRUE, %s, 'P')
-        '''
-        
-        # Add qr_session_id and marked_by_qr columns if they don't exist
-        try:
-            db.execute_query("ALTER TABLE attendance ADD COLUMN marked_by_qr BOOLEAN DEFAULT FALSE")
-            db.execute_query("ALTER TABLE attendance ADD COLUMN qr_session_id VARCHAR(255)")
-        except:
-            pass  # Columns might already exist
-        
-        attendance_result = db.execute_query(attendance_query, (
-            student_id, qr_result['faculty_id'], qr_result['subject'], 
-            qr_result['session_type'], qr_result['session_id']
-        ))
-        
+
+        if not buffered:
+            attendance_query = '''
+                INSERT INTO attendance
+                (user_id, faculty_id, attendance_date, attendance_time,
+                 subject, session_type, marked_by_face, marked_by_qr, qr_session_id, status)
+                VALUES (%s, %s, CURDATE(), CURTIME(), %s, %s, TRUE, TRUE, %s, 'P')
+            '''
+            attendance_result = db.execute_query(attendance_query, (
+                student_id, qr_result['faculty_id'], qr_result['subject'],
+                qr_result['session_type'], qr_result['session_id']
+            ))
+        else:
+            attendance_buffer.add(
+                student_id, qr_result['faculty_id'], qr_result['subject'],
+                qr_result['session_type'], qr_result['session_id']
+            )
+            attendance_result = True
+
         if attendance_result:
-            # Emit real-time update to faculty
-            socketio.emit('student_marked_attendance', {
-                'student_id': student_id,
-                'student_name': student['name'],
-                'enrollment_no': student['enrollment_no'],
-                'subject': qr_result['subject'],
-                'session_id': qr_result['session_id'],
-                'total_scanned': qr_result['scanned_students']
-            }, room=f"faculty_{qr_result['faculty_id']}")
+            # Emit real-time update to faculty without blocking the response
+            socketio.start_background_task(
+                socketio.emit, 'student_marked_attendance', {
+                    'student_id': student_id,
+                    'student_name': student['name'],
+                    'enrollment_no': student['enrollment_no'],
+                    'subject': qr_result['subject'],
+                    'session_id': qr_result['session_id'],
+                    'total_scanned': qr_result['scanned_students']
+                }, room=f"faculty_{qr_result['faculty_id']}")
             
             return jsonify({
                 'success': True,
@@ -1017,7 +1368,7 @@ def scan_attendance_qr():
             return jsonify({'success': False, 'message': 'Failed to mark attendance in database'})
             
     except Exception as e:
-        logger.error(f"Error scanning QR code: {e}")
+        logger.error("Error scanning QR code: %s", e)
         return jsonify({'success': False, 'message': f'Server error: {str(e)}'})
 
 # SocketIO Event Handlers for Real-time Updates
@@ -1028,14 +1379,15 @@ def handle_connect():
     role = session.get('role')
     
     if user_id and role:
-        # Join role-specific room
-        join_room(f"{role}_room")
-        
-        if role == 'faculty':
-            join_room(f"faculty_{user_id}")
-        elif role == 'admin':
-            join_room('admin_room')
-        
+        # Room list is precomputed at login; sessions from before that
+        # change rebuild it here once
+        rooms = session.get('rooms')
+        if not rooms:
+            rooms = _user_rooms(role, user_id, session.get('department', 'Computer Science'))
+            session['rooms'] = rooms
+        for room in rooms:
+            join_room(room)
+
         logger.info(f"User {user_id} ({role}) connected to SocketIO")
         emit('connected', {'status': 'Connected successfully'})
 
@@ -1046,12 +1398,9 @@ def handle_disconnect():
     role = session.get('role')
     
     if user_id and role:
-        leave_room(f"{role}_room")
-        if role == 'faculty':
-            leave_room(f"faculty_{user_id}")
-        elif role == 'admin':
-            leave_room('admin_room')
-        
+        for room in session.get('rooms') or _user_rooms(role, user_id, session.get('department', 'Computer Science')):
+            leave_room(room)
+
         logger.info(f"User {user_id} ({role}) disconnected from SocketIO")
 
 @socketio.on('join_session_room')
@@ -1071,11 +1420,17 @@ def handle_session_update_request(data):
         faculty_id = session.get('user_id')
         
         # Get current session info
-        session_info = qr_service.get_session_info(session_id)
+        session_info = get_qr_service().get_session_info(session_id)
         if session_info and session_info['faculty_id'] == faculty_id:
+            # The Redis scan set (kept by the attendance buffer) is the
+            # shared source of truth across workers; the in-process
+            # session list only sees scans handled by this worker
+            scanned = attendance_buffer.scanned_count(session_id)
+            if scanned is None:
+                scanned = len(session_info.get('students_scanned', []))
             emit('session_update', {
                 'session_id': session_id,
-                'students_scanned': len(session_info.get('students_scanned', [])),
+                'students_scanned': scanned,
                 'is_active': session_info.get('is_active', False)
             })
 
@@ -1108,8 +1463,9 @@ def start_attendance_session():
             return jsonify({'success': False, 'message': 'Subject and session type are required'}), 400
 
         faculty_id = session.get('user_id')
-        session_date = datetime.now().date()
-        start_time = datetime.now().time()
+        now = datetime.now()
+        session_date = now.date()
+        start_time = now.time()
 
         # Insert the new session
         query = '''
@@ -1128,7 +1484,7 @@ def start_attendance_session():
             'subject': subject,
             'session_type': session_type,
             'faculty_id': faculty_id,
-            'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            'timestamp': now.strftime('%Y-%m-%d %H:%M:%S')
         })
 
         return jsonify({
@@ -1138,8 +1494,7 @@ def start_attendance_session():
         })
 
     except Exception as e:
-        logger.error(f"Error in start_attendance_session: {str(e)}")
-        logger.error(traceback.format_exc())
+        logger.exception("Error in start_attendance_session: %s", e)
         return jsonify({'success': False, 'message': 'An error occurred while starting the session'}), 500
 
 @app.route('/take_attendance')
@@ -1165,7 +1520,9 @@ def process_attendance():
 
         if method == 'face':
             logger.info("Starting face recognition process")
-            success, user, message = face_processor.recognize_face_from_camera()
+            success, user, message = run_blocking(
+                get_face_processor().recognize_face_from_camera
+            )
             logger.info(f"Face recognition result: success={success}, message={message}")
 
             if success:
@@ -1176,14 +1533,9 @@ def process_attendance():
 
                 logger.info(f"Attempting to mark attendance for user {user_id} ({user['name']}) in {subject}")
 
-                check_query = '''
-                    SELECT id FROM attendance 
-                    WHERE user_id = %s AND attendance_date = CURDATE() 
-                    AND subject = %s AND session_type = %s
-                '''
-                existing = db.execute_query(check_query, (user_id, subject, session_type))
+                existing = db.execute_query(_Q_ATTENDANCE_EXISTS, (user_id, subject, session_type))
 
-                if existing:
+                if existing and existing[0]['e']:
                     logger.warning(f"Attendance already marked for user {user_id} today")
                     return jsonify({'success': False, 'message': 'Attendance already marked for today'})
 
@@ -1203,7 +1555,7 @@ def process_attendance():
                         'enrollment_no': user['enrollment_no']
                     })
                 else:
-                    logger.error(f"Failed to insert attendance record for user {user_id}")
+                    logger.error("Failed to insert attendance record for user %s", user_id)
                     return jsonify({'success': False, 'message': 'Failed to mark attendance'})
             else:
                 logger.warning(f"Face recognition failed: {message}")
@@ -1214,7 +1566,7 @@ def process_attendance():
             if not rfid_uid:
                 return jsonify({'success': False, 'message': 'RFID UID not provided'})
 
-            success, user = rfid_reader.verify_card(rfid_uid)
+            success, user = get_rfid_reader().verify_card(rfid_uid)
 
             if success:
                 user_id = user['id']
@@ -1222,14 +1574,9 @@ def process_attendance():
                 subject = data.get('subject', 'General')
                 session_type = data.get('session_type', 'lecture')
 
-                check_query = '''
-                    SELECT id FROM attendance 
-                    WHERE user_id = %s AND attendance_date = CURDATE() 
-                    AND subject = %s AND session_type = %s
-                '''
-                existing = db.execute_query(check_query, (user_id, subject, session_type))
+                existing = db.execute_query(_Q_ATTENDANCE_EXISTS, (user_id, subject, session_type))
 
-                if existing:
+                if existing and existing[0]['e']:
                     return jsonify({'success': False, 'message': 'Attendance already marked for today'})
 
                 insert_query = '''
@@ -1254,8 +1601,7 @@ def process_attendance():
             return jsonify({'success': False, 'message': 'Invalid method'})
 
     except Exception as e:
-        logger.error(f"Error processing attendance: {e}")
-        logger.error(traceback.format_exc())
+        logger.exception("Error processing attendance: %s", e)
         return jsonify({'success': False, 'message': 'Error processing attendance'}), 500
 
 @app.route('/get_session_stats/<int:session_id>', methods=['GET'])
@@ -1263,51 +1609,35 @@ def process_attendance():
 def get_session_stats(session_id):
     """Get real-time statistics for a session"""
     try:
-        # Get session details
-        session_query = '''
-            SELECT * FROM sessions 
-            WHERE id = %s AND faculty_id = %s
-        '''
-        session_data = db.execute_query(session_query, (session_id, session.get('user_id')))
-        
-        if not session_data:
-            return jsonify({'success': False, 'message': 'Session not found'}), 404
-        
-        # Get attendance statistics for this session
+        # Session lookup and its attendance aggregates in one round
+        # trip: the scalar subqueries reuse the row's own subject and
+        # session_type, replacing the old session + stats query pair
         stats_query = '''
-            SELECT 
-                COUNT(*) as present_count,
-                COUNT(DISTINCT u.enrollment_no) as unique_students,
-                MAX(a.attendance_time) as last_attendance_time
-            FROM attendance a
-            JOIN users u ON a.user_id = u.id
-            WHERE a.faculty_id = %s 
-            AND a.subject = %s 
-            AND a.session_type = %s
-            AND a.attendance_date = CURDATE()
-        '''
-        stats = db.execute_query(stats_query, (
-            session.get('user_id'), 
-            session_data[0]['subject'],
-            session_data[0]['session_type']
-        ))
-        
-        # Get total expected students (this is a simplified approach - you might want to adjust based on class enrollment)
-        total_students_query = '''
-            SELECT COUNT(*) as total_students 
-            FROM users 
-            WHERE role = 'student'
+            SELECT s.subject, s.session_type,
+                (SELECT COUNT(*) FROM attendance a
+                 WHERE a.faculty_id = s.faculty_id AND a.subject = s.subject
+                 AND a.session_type = s.session_type
+                 AND a.attendance_date = CURDATE()) AS present_count,
+                (SELECT MAX(a.attendance_time) FROM attendance a
+                 WHERE a.faculty_id = s.faculty_id AND a.subject = s.subject
+                 AND a.session_type = s.session_type
+                 AND a.attendance_date = CURDATE()) AS last_attendance_time
+            FROM sessions s
+            WHERE s.id = %s AND s.faculty_id = %s
         '''
-        total_data = db.execute_query(total_students_query)
-        
-        present_count = stats[0]['present_count'] if stats else 0
-        total_students = total_data[0]['total_students'] if total_data else 0
+        stats = db.execute_query(stats_query, (session_id, session.get('user_id')))
+
+        if not stats:
+            return jsonify({'success': False, 'message': 'Session not found'}), 404
+
+        present_count = stats[0]['present_count'] or 0
+        total_students = get_total_students()
         absent_count = total_students - present_count
         attendance_percentage = round((present_count / total_students * 100), 2) if total_students > 0 else 0
-        
+
         # Format last_attendance_time for JSON serialization
         last_attendance_time = None
-        if stats and stats[0]['last_attendance_time']:
+        if stats[0]['last_attendance_time']:
             last_attendance_time = str(stats[0]['last_attendance_time'])
         
         return jsonify({
@@ -1322,7 +1652,7 @@ def get_session_stats(session_id):
         })
         
     except Exception as e:
-        logger.error(f"Error getting session stats: {e}")
+        logger.error("Error getting session stats: %s", e)
         return jsonify({'success': False, 'message': 'Error getting session statistics'}), 500
 
 @app.route('/get_session_attendance/<int:session_id>', methods=['GET'])
@@ -1330,16 +1660,21 @@ def get_session_stats(session_id):
 def get_session_attendance(session_id):
     """Get attendance records for a session, ordered by enrollment number"""
     try:
-        # Get session details
+        # Get session details - only the two columns the attendance
+        # query needs, not the whole row
+        faculty_id = session.get('user_id')
         session_query = '''
-            SELECT * FROM sessions 
+            SELECT subject, session_type FROM sessions
             WHERE id = %s AND faculty_id = %s
         '''
-        session_data = db.execute_query(session_query, (session_id, session.get('user_id')))
-        
+        session_data = db.execute_query(session_query, (session_id, faculty_id))
+
         if not session_data:
             return jsonify({'success': False, 'message': 'Session not found'}), 404
-        
+
+        subject = session_data[0]['subject']
+        session_type = session_data[0]['session_type']
+
         # Get attendance records ordered by enrollment number (ascending)
         attendance_query = '''
             SELECT 
@@ -1361,11 +1696,7 @@ def get_session_attendance(session_id):
             ORDER BY u.enrollment_no ASC
         '''
         
-        attendance_records = db.execute_query(attendance_query, (
-            session.get('user_id'),
-            session_data[0]['subject'],
-            session_data[0]['session_type']
-        ))
+        attendance_records = db.execute_query(attendance_query, (faculty_id, subject, session_type))
         
         # Convert timedelta objects to string format for JSON serialization
         if attendance_records:
@@ -1373,13 +1704,13 @@ def get_session_attendance(session_id):
                 if record.get('attendance_time'):
                     record['attendance_time'] = str(record['attendance_time'])
         
-        return jsonify({
+        return ojson({
             'success': True,
             'attendance_records': attendance_records or []
         })
         
     except Exception as e:
-        logger.error(f"Error getting session attendance: {e}")
+        logger.error("Error getting session attendance: %s", e)
         return jsonify({'success': False, 'message': 'Error getting attendance records'}), 500
 
 @app.route('/end_attendance_session/<int:session_id>', methods=['POST'])
@@ -1387,28 +1718,38 @@ def get_session_attendance(session_id):
 def end_attendance_session(session_id):
     """End an attendance session"""
     try:
-        # Update session with end time
-        update_query = '''
-            UPDATE sessions 
-            SET end_time = CURTIME()
+        # Load the event details up front (this also checks ownership),
+        # so the UPDATE result doesn't need a second SELECT
+        session_query = '''
+            SELECT subject, session_type FROM sessions
             WHERE id = %s AND faculty_id = %s
         '''
-        result = db.execute_query(update_query, (session_id, session.get('user_id')))
-        
+        session_info = db.execute_query(session_query, (session_id, session.get('user_id')))
+
+        result = None
+        if session_info:
+            update_query = '''
+                UPDATE sessions
+                SET end_time = CURTIME()
+                WHERE id = %s AND faculty_id = %s
+            '''
+            result = db.execute_query(update_query, (session_id, session.get('user_id')))
+
         if result:
-            # Get session details for the event
-            session_query = "SELECT subject, session_type FROM sessions WHERE id = %s"
-            session_info = db.execute_query(session_query, (session_id,))
-            
-            if session_info:
-                # Emit Socket.IO event for real-time analytics update
-                socketio.emit('session_ended', {
-                    'session_id': session_id,
-                    'subject': session_info[0].get('subject'),
-                    'session_type': session_info[0].get('session_type'),
-                    'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                })
-            
+            # A finished session changes the aggregates, so dashboards
+            # should not keep serving the pre-session snapshot
+            _bump_data_version()
+
+            # Hand the Socket.IO broadcast to a background task - with a
+            # message queue behind socketio.emit the publish costs real
+            # time, and the HTTP client doesn't need to wait for it
+            socketio.start_background_task(socketio.emit, 'session_ended', {
+                'session_id': session_id,
+                'subject': session_info[0].get('subject'),
+                'session_type': session_info[0].get('session_type'),
+                'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            })
+
             return jsonify({
                 'success': True,
                 'message': 'Session ended successfully'
@@ -1420,39 +1761,72 @@ def end_attendance_session(session_id):
             }), 400
             
     except Exception as e:
-        logger.error(f"Error ending session: {e}")
+        logger.error("Error ending session: %s", e)
         return jsonify({'success': False, 'message': 'Error ending session'}), 500
 
+# Per-student attendance aggregates as a direct join rather than the
+# old derived-table form: the optimizer materialized that subquery over
+# all of attendance (every role) before joining, while grouping the
+# join output aggregates only the student rows and walks
+# idx_att_user_status instead of scanning.
+_Q_STUDENT_ROWS = '''
+    SELECT u.*,
+           COUNT(a.id) as total_classes,
+           COALESCE(SUM(a.status = 'P'), 0) as attended_classes,
+           COALESCE(ROUND(100 * SUM(a.status = 'P') / NULLIF(COUNT(a.id), 0), 2), 0)
+               as attendance_percentage
+    FROM users u
+    LEFT JOIN attendance a ON a.user_id = u.id
+    WHERE u.role = 'student'
+    GROUP BY u.id
+    ORDER BY u.enrollment_no
+'''
+
+# One monotonic counter stamps every derived-data cache in this file
+# (student roster below, analytics dashboard further down). A write
+# bumps it and every stamped entry goes stale at once; readers compare
+# stamps instead of deleting keys, so invalidation is lock-free and O(1)
+# no matter how many caches hang off it.
+_data_version = itertools.count()
+_data_version_current = next(_data_version)
+
+def _bump_data_version():
+    """Invalidate all version-stamped caches after a write"""
+    global _data_version_current
+    _data_version_current = next(_data_version)
+
+# Memoized result of the query above. A page view immediately followed
+# by an export (the common admin flow) reuses one aggregation; roster
+# writes bump the shared version so a change is visible on the next
+# request, with the short TTL as backstop.
+_students_cache = None  # (version, fetched_at, rows)
+_students_lock = threading.Lock()
+_STUDENTS_TTL = 10
+
+def _student_attendance_rows():
+    """Student rows with attendance totals, shared by page and export"""
+    global _students_cache
+    with _students_lock:
+        cached = _students_cache
+        if (cached and cached[0] == _data_version_current
+                and time.time() - cached[1] < _STUDENTS_TTL):
+            return cached[2]
+    version = _data_version_current
+    rows = db.execute_query(_Q_STUDENT_ROWS)
+    with _students_lock:
+        if version == _data_version_current:
+            _students_cache = (version, time.time(), rows)
+    return rows
+
 @app.route('/students')
 @admin_required
 def students():
     """Student management page"""
     try:
-        query = '''
-            SELECT u.*, 
-                   COALESCE(att_stats.total_classes, 0) as total_classes,
-                   COALESCE(att_stats.attended_classes, 0) as attended_classes,
-                   CASE 
-                       WHEN COALESCE(att_stats.total_classes, 0) > 0 
-                       THEN ROUND((COALESCE(att_stats.attended_classes, 0) / att_stats.total_classes) * 100, 2)
-                       ELSE 0 
-                   END as attendance_percentage
-            FROM users u
-            LEFT JOIN (
-                SELECT user_id,
-                       COUNT(*) as total_classes,
-                       SUM(CASE WHEN status = 'P' THEN 1 ELSE 0 END) as attended_classes
-                FROM attendance
-                GROUP BY user_id
-            ) att_stats ON u.id = att_stats.user_id
-            WHERE u.role = 'student'
-            ORDER BY u.enrollment_no
-        '''
-        students_data = db.execute_query(query)
+        students_data = _student_attendance_rows()
         return render_template('admin/students.html', students=students_data)
     except Exception as e:
-        logger.error(f"Error fetching students: {e}")
-        logger.error(traceback.format_exc())
+        logger.exception("Error fetching students: %s", e)
         flash('Error fetching students', 'error')
         return redirect(url_for('dashboard'))
 
@@ -1474,6 +1848,15 @@ def add_student():
         success, message = auth_manager.register_user(name, enrollment_no, mobile_number, role)
 
         if success:
+            _bump_data_version()
+            # Invalidate the cached student count like the registration
+            # blueprint does, so session-stat denominators pick up the
+            # new student before the TTL expires
+            if role == 'student' and redis_cache is not None:
+                try:
+                    redis_cache.delete('stats:total_students')
+                except Exception as e:
+                    logger.warning(f"Could not invalidate student count cache: {e}")
             user_type = 'Faculty' if role == 'faculty' else 'Student'
             flash(f'{user_type} added successfully', 'success')
         else:
@@ -1481,12 +1864,119 @@ def add_student():
             flash(f'Failed to add {user_type}: {message}', 'error')
 
     except Exception as e:
-        logger.error(f"Error adding user: {e}")
-        logger.error(traceback.format_exc())
+        logger.exception("Error adding user: %s", e)
         flash('Error adding user', 'error')
 
     return redirect(url_for('dashboard'))
 
+# Short-lived cache for the dashboard payload: every open dashboard
+# polls this endpoint, so identical (filter, role, user) requests within
+# the TTL reuse one computed response instead of re-running the
+# aggregation queries. Semester-wide numbers barely move, so that
+# filter keeps its entry much longer. Entries carry the shared data
+# version, so a session ending invalidates them all at once.
+_analytics_cache = {}
+_analytics_cache_lock = threading.Lock()
+_ANALYTICS_TTL = 20
+_ANALYTICS_TTL_SEMESTER = 300
+
+# 1-4. Overall stats, trend, subject and time-of-day aggregates.
+# All four used to be separate queries - four network round trips per
+# poll. UNION ALL with a discriminator column ships them in one
+# statement; the padded label/value columns keep the row shapes
+# compatible and Python splits the rows back out. Stats and trend read
+# the per-user-per-day attendance_summary rollup (maintained by
+# trigger) instead of re-aggregating raw attendance; subject and hour
+# breakdowns still need raw rows. Every block binds the same half-open
+# [start, end) range, so the statement text never changes.
+_Q_DASHBOARD_AGGREGATES = '''
+    (SELECT 'stats' as kind, NULL as label,
+        (SELECT COUNT(*) FROM users WHERE role = 'student') as value,
+        COUNT(DISTINCT s.date) as extra1,
+        ROUND(100 * SUM(s.present) / NULLIF(SUM(s.total), 0), 2) as extra2,
+        NULL as extra3
+    FROM attendance_summary s
+    WHERE s.date >= %s AND s.date < %s)
+    UNION ALL
+    (SELECT 'trend', DATE_FORMAT(s.date, '%%b %%d'),
+        ROUND(100 * SUM(s.present) / NULLIF(SUM(s.total), 0), 2),
+        NULL, NULL, NULL
+    FROM attendance_summary s
+    WHERE s.date >= %s AND s.date < %s
+    GROUP BY s.date
+    ORDER BY s.date ASC
+    LIMIT 10)
+    UNION ALL
+    (SELECT 'subject', c.course_name,
+        ROUND(AVG(CASE WHEN a.status = 'P' THEN 100 ELSE 0 END), 2),
+        NULL, NULL, NULL
+    FROM attendance a
+    LEFT JOIN courses c ON a.subject = c.course_name
+    WHERE a.timestamp >= %s AND a.timestamp < %s
+    GROUP BY c.course_name
+    ORDER BY ROUND(AVG(CASE WHEN a.status = 'P' THEN 100 ELSE 0 END), 2) DESC
+    LIMIT 5)
+    UNION ALL
+    (SELECT 'time', CONCAT(LPAD(HOUR(a.timestamp), 2, '0'), ':00'),
+        ROUND(AVG(CASE WHEN a.status = 'P' THEN 100 ELSE 0 END), 2),
+        NULL, NULL, NULL
+    FROM attendance a
+    WHERE a.timestamp >= %s AND a.timestamp < %s
+    GROUP BY HOUR(a.timestamp)
+    ORDER BY HOUR(a.timestamp) ASC
+    LIMIT 24)
+'''
+
+_Q_DASHBOARD_ACTIVITY = '''
+    SELECT
+        u.name as student_name,
+        COALESCE(a.subject, 'General') as subject,
+        DATE_FORMAT(a.timestamp, '%%h:%%i %%p') as time_str,
+        a.status
+    FROM attendance a
+    JOIN users u ON a.user_id = u.user_id
+    WHERE a.timestamp >= %s AND a.timestamp < %s
+    ORDER BY a.timestamp DESC
+    LIMIT 10
+'''
+
+# Mock department breakdown until a departments table exists; tuples at
+# module level so the handler allocates nothing for them per request
+_DEPT_LABELS = ('CSE', 'IT', 'ECE', 'MECH')
+_DEPT_DATA = (85, 78, 82, 75)
+
+_Q_LOW_ATTENDANCE_COUNT = '''
+    SELECT COUNT(*) as low_attendance_count FROM (
+        SELECT user_id FROM attendance_summary
+        GROUP BY user_id
+        HAVING SUM(present) / SUM(total) < 0.75
+    ) low_att
+'''
+_LOW_ATTENDANCE_TTL = 300
+
+def get_low_attendance_count():
+    """Students below 75% attendance, cached in Redis for five minutes.
+
+    The per-user GROUP BY behind this number is the most expensive part
+    of the dashboard stats and the count moves at most a few times a
+    day, so polls within the TTL share one computed value.
+    """
+    if redis_cache is not None:
+        try:
+            cached = redis_cache.get('stats:low_attendance')
+            if cached is not None:
+                return int(cached)
+        except Exception as e:
+            logger.warning(f"Low-attendance cache read failed: {e}")
+    rows = db.execute_query(_Q_LOW_ATTENDANCE_COUNT)
+    count = rows[0]['low_attendance_count'] if rows else 0
+    if redis_cache is not None:
+        try:
+            redis_cache.setex('stats:low_attendance', _LOW_ATTENDANCE_TTL, count)
+        except Exception as e:
+            logger.warning(f"Low-attendance cache write failed: {e}")
+    return count
+
 @app.route('/api/analytics/dashboard')
 @login_required
 def api_analytics_dashboard():
@@ -1495,144 +1985,78 @@ def api_analytics_dashboard():
         time_filter = request.args.get('filter', 'today')
         user_role = session.get('role')
         user_id = session.get('user_id')
-        
-        # Date filtering based on filter parameter
-        date_condition = "DATE(a.timestamp) = CURRENT_DATE"
+
+        cache_key = (time_filter, user_role, user_id)
+        with _analytics_cache_lock:
+            cached = _analytics_cache.get(cache_key)
+        if cached and cached[0] == _data_version_current and time.time() < cached[1]:
+            return ojson(cached[2])
+
+        # The filter becomes a half-open [start, end) range bound as
+        # parameters, so MySQL sees one statement text per endpoint
+        # instead of four interpolated variants to re-parse
+        today = datetime.now().date()
+        range_end = today + timedelta(days=1)
         if time_filter == 'week':
-            date_condition = "a.timestamp >= DATE_SUB(CURRENT_DATE, INTERVAL 7 DAY)"
+            range_start = today - timedelta(days=7)
         elif time_filter == 'month':
-            date_condition = "a.timestamp >= DATE_SUB(CURRENT_DATE, INTERVAL 30 DAY)"
+            range_start = today - timedelta(days=30)
         elif time_filter == 'semester':
-            date_condition = "1=1"  # All data
-        
-        # 1. Overall Statistics
-        stats_query = f'''
-            SELECT 
-                COUNT(DISTINCT u.user_id) as total_students,
-                COUNT(DISTINCT DATE(a.timestamp)) as total_sessions,
-                ROUND(AVG(CASE WHEN a.status = 'P' THEN 100 ELSE 0 END), 2) as avg_attendance,
-                COUNT(DISTINCT CASE WHEN att_pct.percentage < 75 THEN u.user_id END) as low_attendance_count
-            FROM users u
-            LEFT JOIN attendance a ON u.user_id = a.user_id AND {date_condition}
-            LEFT JOIN (
-                SELECT user_id, 
-                       ROUND(AVG(CASE WHEN status = 'P' THEN 100 ELSE 0 END), 2) as percentage
-                FROM attendance
-                GROUP BY user_id
-            ) att_pct ON u.user_id = att_pct.user_id
-            WHERE u.role = 'student'
-        '''
+            range_start = '1970-01-01'  # All data
+        else:
+            range_start = today
         
-        stats_result = db.execute_query(stats_query)
-        stats = stats_result[0] if stats_result else {
+        aggregate_rows = db.execute_query(
+            _Q_DASHBOARD_AGGREGATES, (range_start, range_end) * 4
+        )
+        stats = {
             'total_students': 0,
             'total_sessions': 0,
             'avg_attendance': 0,
             'low_attendance_count': 0
         }
-        
-        # 2. Attendance Trend (Last 7 days)
-        trend_query = f'''
-            SELECT 
-                DATE(a.timestamp) as date,
-                ROUND(AVG(CASE WHEN a.status = 'P' THEN 100 ELSE 0 END), 2) as attendance_percentage
-            FROM attendance a
-            WHERE {date_condition}
-            GROUP BY DATE(a.timestamp)
-            ORDER BY DATE(a.timestamp) ASC
-            LIMIT 10
-        '''
-        
-        trend_result = db.execute_query(trend_query)
         trend_labels = []
         trend_data = []
-        
-        if trend_result:
-            for row in trend_result:
-                date_str = row['date'].strftime('%b %d') if isinstance(row['date'], datetime) else str(row['date'])
-                trend_labels.append(date_str)
-                trend_data.append(float(row['attendance_percentage']) if row['attendance_percentage'] else 0)
-        
-        # 3. Subject-wise Distribution
-        subject_query = f'''
-            SELECT 
-                c.course_name as subject,
-                COUNT(DISTINCT a.user_id) as student_count,
-                ROUND(AVG(CASE WHEN a.status = 'P' THEN 100 ELSE 0 END), 2) as attendance_percentage
-            FROM attendance a
-            LEFT JOIN courses c ON a.subject = c.course_name
-            WHERE {date_condition}
-            GROUP BY c.course_name
-            ORDER BY attendance_percentage DESC
-            LIMIT 5
-        '''
-        
-        subject_result = db.execute_query(subject_query)
         subject_labels = []
         subject_data = []
-        
-        if subject_result:
-            for row in subject_result:
-                subject_labels.append(row['subject'] if row['subject'] else 'Unknown')
-                subject_data.append(float(row['attendance_percentage']) if row['attendance_percentage'] else 0)
-        
-        # 4. Time-wise Attendance
-        time_query = f'''
-            SELECT 
-                HOUR(a.timestamp) as hour,
-                ROUND(AVG(CASE WHEN a.status = 'P' THEN 100 ELSE 0 END), 2) as attendance_percentage
-            FROM attendance a
-            WHERE {date_condition}
-            GROUP BY HOUR(a.timestamp)
-            ORDER BY hour ASC
-        '''
-        
-        time_result = db.execute_query(time_query)
         time_labels = []
         time_data = []
-        
-        if time_result:
-            for row in time_result:
-                hour = int(row['hour']) if row['hour'] else 0
-                time_label = f"{hour:02d}:00"
-                time_labels.append(time_label)
-                time_data.append(float(row['attendance_percentage']) if row['attendance_percentage'] else 0)
-        
-        # 5. Department-wise (if department table exists)
-        department_labels = ['CSE', 'IT', 'ECE', 'MECH']
-        department_data = [85, 78, 82, 75]  # Mock data for now
-        
+
+        if aggregate_rows:
+            for row in aggregate_rows:
+                kind = row['kind']
+                if kind == 'stats':
+                    stats = {
+                        'total_students': row['value'],
+                        'total_sessions': row['extra1'],
+                        'avg_attendance': row['extra2'],
+                        'low_attendance_count': get_low_attendance_count()
+                    }
+                elif kind == 'trend':
+                    trend_labels.append(str(row['label']))
+                    trend_data.append(float(row['value']) if row['value'] else 0)
+                elif kind == 'subject':
+                    subject_labels.append(row['label'] if row['label'] else 'Unknown')
+                    subject_data.append(float(row['value']) if row['value'] else 0)
+                elif kind == 'time':
+                    time_labels.append(str(row['label']))
+                    time_data.append(float(row['value']) if row['value'] else 0)
+
         # 6. Recent Activity
-        activity_query = f'''
-            SELECT 
-                u.name as student_name,
-                a.subject,
-                a.timestamp,
-                a.status
-            FROM attendance a
-            JOIN users u ON a.user_id = u.user_id
-            WHERE {date_condition}
-            ORDER BY a.timestamp DESC
-            LIMIT 10
-        '''
-        
-        activity_result = db.execute_query(activity_query)
-        recent_activity = []
-        
-        if activity_result:
-            for row in activity_result:
-                timestamp = row['timestamp']
-                if isinstance(timestamp, datetime):
-                    time_str = timestamp.strftime('%I:%M %p')
-                else:
-                    time_str = str(timestamp)
-                
-                recent_activity.append({
-                    'student': row['student_name'],
-                    'subject': row['subject'] if row['subject'] else 'General',
-                    'time': time_str,
-                    'status': row['status']
-                })
+        activity_result = db.execute_query(
+            _Q_DASHBOARD_ACTIVITY, (range_start, range_end)
+        )
+        # Formatting happens in SQL (DATE_FORMAT/COALESCE), leaving only
+        # a key rename per row here
+        recent_activity = [
+            {
+                'student': row['student_name'],
+                'subject': row['subject'],
+                'time': row['time_str'],
+                'status': row['status']
+            }
+            for row in activity_result or []
+        ]
         
         # Prepare response
         response_data = {
@@ -1656,19 +2080,24 @@ def api_analytics_dashboard():
                     'data': time_data
                 },
                 'department_data': {
-                    'labels': department_labels,
-                    'data': department_data
+                    'labels': _DEPT_LABELS,
+                    'data': _DEPT_DATA
                 }
             },
             'recent_activity': recent_activity,
-            'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            'timestamp': datetime.now().isoformat(sep=' ', timespec='seconds')
         }
-        
-        return jsonify(response_data)
-        
+
+        ttl = _ANALYTICS_TTL_SEMESTER if time_filter == 'semester' else _ANALYTICS_TTL
+        with _analytics_cache_lock:
+            _analytics_cache[cache_key] = (
+                _data_version_current, time.time() + ttl, response_data
+            )
+
+        return ojson(response_data)
+
     except Exception as e:
-        logger.error(f"Error in analytics dashboard API: {e}")
-        logger.error(traceback.format_exc())
+        logger.exception("Error in analytics dashboard API: %s", e)
         return jsonify({
             'error': str(e),
             'stats': {'total_students': 0, 'avg_attendance': 0, 'total_sessions': 0, 'low_attendance_count': 0},
@@ -1732,8 +2161,7 @@ def get_student_details(student_id):
         attendance_data = analytics.calculate_attendance_percentage(student_id)
         return jsonify({'success': True, 'student': student, 'attendance_data': attendance_data})
     except Exception as e:
-        logger.error(f"Error getting student details: {e}")
-        logger.error(traceback.format_exc())
+        logger.exception("Error getting student details: %s", e)
         return jsonify({'success': False, 'message': 'Error retrieving student details'})
 
 @app.route('/api/student/<int:student_id>', methods=['DELETE'])
@@ -1744,62 +2172,54 @@ def delete_student(student_id):
         delete_query = "DELETE FROM users WHERE id = %s AND role = 'student'"
         result = db.execute_query(delete_query, (student_id,))
         if result:
+            _bump_data_version()
+            # Drop any cached credential verification so the deleted
+            # student can't keep logging in until the TTL runs out
+            verify_cache.invalidate(student_id)
             return jsonify({'success': True, 'message': 'Student deleted successfully'})
         else:
             return jsonify({'success': False, 'message': 'Failed to delete student'})
     except Exception as e:
-        logger.error(f"Error deleting student: {e}")
-        logger.error(traceback.format_exc())
+        logger.exception("Error deleting student: %s", e)
         return jsonify({'success': False, 'message': 'Error deleting student'})
 
+class _CsvLine:
+    """Minimal csv.writer target that hands back each encoded line"""
+    def write(self, line):
+        return line
+
 @app.route('/api/students/export')
 @admin_required
 def export_students():
     """Export students data as CSV"""
     import csv
-    import io
 
     try:
-        query = '''
-            SELECT u.enrollment_no, u.name, u.mobile_number, u.created_at,
-                   COALESCE(att_stats.total_classes, 0) as total_classes,
-                   COALESCE(att_stats.attended_classes, 0) as attended_classes,
-                   CASE 
-                       WHEN COALESCE(att_stats.total_classes, 0) > 0 
-                       THEN ROUND((COALESCE(att_stats.attended_classes, 0) / att_stats.total_classes) * 100, 2)
-                       ELSE 0 
-                   END as attendance_percentage
-            FROM users u
-            LEFT JOIN (
-                SELECT user_id,
-                       COUNT(*) as total_classes,
-                       SUM(CASE WHEN status = 'P' THEN 1 ELSE 0 END) as attended_classes
-                FROM attendance
-                GROUP BY user_id
-            ) att_stats ON u.id = att_stats.user_id
-            WHERE u.role = 'student'
-            ORDER BY u.enrollment_no
-        '''
-        students = db.execute_query(query)
-        output = io.StringIO()
-        writer = csv.writer(output)
-        writer.writerow(['Enrollment No', 'Name', 'Mobile', 'Joined Date', 'Total Classes', 'Attended', 'Attendance %'])
-        for student in students:
-            writer.writerow([
-                student.get('enrollment_no'),
-                student.get('name'),
-                student.get('mobile_number'),
-                student.get('created_at'),
-                student.get('total_classes'),
-                student.get('attended_classes'),
-                student.get('attendance_percentage')
-            ])
-        output.seek(0)
-        return Response(output.getvalue(), mimetype='text/csv',
+        students = _student_attendance_rows()
+
+        # Stream one encoded line per row instead of accumulating the
+        # whole file in a StringIO and copying it out with getvalue() -
+        # the client starts receiving immediately and the worker never
+        # holds a second full-file string
+        def generate():
+            writer = csv.writer(_CsvLine())
+            yield writer.writerow(['Enrollment No', 'Name', 'Mobile', 'Joined Date',
+                                   'Total Classes', 'Attended', 'Attendance %'])
+            for student in students or []:
+                yield writer.writerow([
+                    student.get('enrollment_no'),
+                    student.get('name'),
+                    student.get('mobile_number'),
+                    student.get('created_at'),
+                    student.get('total_classes'),
+                    student.get('attended_classes'),
+                    student.get('attendance_percentage')
+                ])
+
+        return Response(generate(), mimetype='text/csv',
                         headers={'Content-Disposition': 'attachment; filename=students_export.csv'})
     except Exception as e:
-        logger.error(f"Error exporting students: {e}")
-        logger.error(traceback.format_exc())
+        logger.exception("Error exporting students: %s", e)
         return jsonify({'success': False, 'message': 'Error exporting data'})
 
 # Error handlers
@@ -1815,11 +2235,179 @@ def internal_error(error):
 def forbidden_error(error):
     return render_template('error.html', error_code=403, error_message="Access forbidden"), 403
 
+def ensure_schema():
+    """One-time schema bootstrap for columns added after the initial release.
+
+    The QR endpoints used to issue ALTER TABLE inside the request path;
+    DDL takes a metadata lock and an implicit commit, so under load it
+    serialized every writer. Checking information_schema here and
+    altering only when a column is actually missing keeps the request
+    handlers DDL-free.
+    """
+    needed = [
+        ('sessions', 'qr_session_id', 'ADD COLUMN qr_session_id VARCHAR(255) UNIQUE'),
+        ('attendance', 'marked_by_qr', 'ADD COLUMN marked_by_qr BOOLEAN DEFAULT FALSE'),
+        ('attendance', 'qr_session_id', 'ADD COLUMN qr_session_id VARCHAR(255)'),
+    ]
+    for table, column, clause in needed:
+        try:
+            existing = db.execute_query(
+                '''SELECT 1 FROM information_schema.COLUMNS
+                   WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = %s''',
+                (table, column)
+            )
+            if not existing:
+                db.execute_query(f"ALTER TABLE {table} {clause}")
+                logger.info(f"Schema: added {table}.{column}")
+        except Exception as e:
+            logger.warning(f"Schema check for {table}.{column} failed: {e}")
+
+    # Covering indexes for the hot lookups: the student-side period
+    # anti-join and marked-periods query and the faculty-side session
+    # stats/attendance lists, all as index walks instead of scans
+    indexes = [
+        ('attendance', 'idx_att_user_date_period_subject',
+         '(user_id, attendance_date, period_number, subject)'),
+        ('attendance', 'idx_att_faculty_subj_sess_date',
+         '(faculty_id, subject, session_type, attendance_date)'),
+        ('sessions', 'idx_sessions_faculty_date',
+         '(faculty_id, session_date)'),
+        ('student_timetable', 'idx_tt_dept_day_active_start',
+         '(department, day_of_week, is_active, start_time)'),
+        ('attendance', 'idx_att_user_status',
+         '(user_id, status)'),
+        ('attendance', 'idx_att_ts_status',
+         '(timestamp, status)'),
+        ('attendance', 'idx_att_user_ts',
+         '(user_id, timestamp, status)'),
+        ('courses', 'idx_courses_name',
+         '(course_name)'),
+        ('otp_verification', 'idx_otp_mobile_code',
+         '(mobile_number, otp_code, is_used)'),
+    ]
+    for table, index_name, index_columns in indexes:
+        try:
+            has_index = db.execute_query(
+                '''SELECT 1 FROM information_schema.STATISTICS
+                   WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+                   AND INDEX_NAME = %s LIMIT 1''',
+                (table, index_name)
+            )
+            if not has_index:
+                db.execute_query(f"CREATE INDEX {index_name} ON {table} {index_columns}")
+                logger.info(f"Schema: added index {index_name}")
+        except Exception as e:
+            logger.warning(f"Schema check for {index_name} failed: {e}")
+
+    # Unique key backing the INSERT IGNORE dedup on the period-stamped
+    # attendance writes (one atomic statement, no TOCTOU window)
+    try:
+        has_unique = db.execute_query(
+            '''SELECT 1 FROM information_schema.STATISTICS
+               WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'attendance'
+               AND INDEX_NAME = 'uk_att_dedup' LIMIT 1'''
+        )
+        if not has_unique:
+            db.execute_query(
+                '''ALTER TABLE attendance ADD UNIQUE KEY uk_att_dedup
+                   (user_id, attendance_date, subject, session_type, period_number)'''
+            )
+            logger.info("Schema: added unique key uk_att_dedup")
+    except Exception as e:
+        logger.warning(f"Schema check for uk_att_dedup failed: {e}")
+
+    # Unique mobile number backing register_user's single-statement
+    # ON DUPLICATE KEY dedup (enrollment_no is already unique)
+    try:
+        has_unique = db.execute_query(
+            '''SELECT 1 FROM information_schema.STATISTICS
+               WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'users'
+               AND INDEX_NAME = 'uk_users_mobile' LIMIT 1'''
+        )
+        if not has_unique:
+            db.execute_query(
+                'ALTER TABLE users ADD UNIQUE KEY uk_users_mobile (mobile_number)'
+            )
+            logger.info("Schema: added unique key uk_users_mobile")
+    except Exception as e:
+        logger.warning(f"Schema check for uk_users_mobile failed: {e}")
+
+    # Per-user-per-day attendance rollup feeding the dashboard stats and
+    # trend series: a trigger folds every attendance INSERT into one
+    # counter row, so those aggregates scan a few KB of summary rows
+    # instead of the whole attendance table on every poll
+    try:
+        has_summary = db.execute_query(
+            '''SELECT 1 FROM information_schema.TABLES
+               WHERE TABLE_SCHEMA = DATABASE()
+               AND TABLE_NAME = 'attendance_summary' LIMIT 1'''
+        )
+        db.execute_query(
+            '''CREATE TABLE IF NOT EXISTS attendance_summary (
+                   user_id INT NOT NULL,
+                   date DATE NOT NULL,
+                   total INT NOT NULL DEFAULT 0,
+                   present INT NOT NULL DEFAULT 0,
+                   PRIMARY KEY (user_id, date),
+                   KEY idx_summary_date (date)
+               )'''
+        )
+        if not has_summary:
+            # Fold the pre-existing attendance history into the fresh
+            # rollup; the triggers only cover rows written after this
+            db.execute_query(
+                '''INSERT INTO attendance_summary (user_id, date, total, present)
+                   SELECT user_id, attendance_date, COUNT(*), SUM(status = 'P')
+                   FROM attendance
+                   GROUP BY user_id, attendance_date'''
+            )
+            logger.info("Schema: backfilled attendance_summary from attendance")
+        has_trigger = db.execute_query(
+            '''SELECT 1 FROM information_schema.TRIGGERS
+               WHERE TRIGGER_SCHEMA = DATABASE()
+               AND TRIGGER_NAME = 'trg_attendance_summary' LIMIT 1'''
+        )
+        if not has_trigger:
+            db.execute_query(
+                '''CREATE TRIGGER trg_attendance_summary
+                   AFTER INSERT ON attendance FOR EACH ROW
+                   INSERT INTO attendance_summary (user_id, date, total, present)
+                   VALUES (NEW.user_id, NEW.attendance_date, 1, NEW.status = 'P')
+                   ON DUPLICATE KEY UPDATE
+                       total = total + 1,
+                       present = present + (NEW.status = 'P')'''
+            )
+            logger.info("Schema: added trigger trg_attendance_summary")
+        # Symmetric delete trigger so clearing attendance (test resets,
+        # student removal) doesn't leave the rollup permanently inflated
+        has_trigger = db.execute_query(
+            '''SELECT 1 FROM information_schema.TRIGGERS
+               WHERE TRIGGER_SCHEMA = DATABASE()
+               AND TRIGGER_NAME = 'trg_attendance_summary_del' LIMIT 1'''
+        )
+        if not has_trigger:
+            db.execute_query(
+                '''CREATE TRIGGER trg_attendance_summary_del
+                   AFTER DELETE ON attendance FOR EACH ROW
+                   UPDATE attendance_summary
+                   SET total = total - 1,
+                       present = present - (OLD.status = 'P')
+                   WHERE user_id = OLD.user_id AND date = OLD.attendance_date'''
+            )
+            logger.info("Schema: added trigger trg_attendance_summary_del")
+    except Exception as e:
+        logger.warning(f"Schema check for attendance_summary failed: {e}")
+
+# Initialize database within app context. This runs on plain import too
+# (gunicorn/uwsgi workers), so the ensure_schema() additions exist under
+# WSGI and not only when app.py is launched directly.
+with app.app_context():
+    initialize_database()
+
 if __name__ == '__main__':
     try:
         # Initialize database
         if db.connect():
-            db.create_tables()
             db.insert_sample_data()
             logger.info("Database initialized successfully")
         else:
@@ -1835,5 +2423,5 @@ if __name__ == '__main__':
                     debug=True,
                     allow_unsafe_werkzeug=True)
     except Exception as e:
-        logger.error(f"Failed to start application: {e}")
+        logger.error("Failed to start application: %s", e)
         sys.exit(1)
@@ -1,29 +1,96 @@
 import bcrypt
+import functools
+import os
 import secrets
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from argon2 import PasswordHasher
+from argon2.exceptions import VerifyMismatchError, InvalidHashError
+from config import Config
 from database.database import db
 from utils.otp_service import OTPService
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Argon2id via the compiled C binding (argon2-cffi), OWASP profile by
+# default - much cheaper per-login than equivalent-security bcrypt
+password_hasher = PasswordHasher(
+    time_cost=Config.ARGON2_TIME_COST,
+    memory_cost=Config.ARGON2_MEMORY_COST,
+    parallelism=1
+)
+
+# Hash work runs off the request worker. Both argon2-cffi and bcrypt
+# release the GIL inside their C cores, so threads give real CPU
+# parallelism here (a process pool would add fork/pickle overhead for
+# nothing), and capping the workers at the core count keeps a burst of
+# logins from saturating every CPU. When eventlet has monkey-patched
+# threading the pool's workers are greenlets sharing one OS thread, so
+# that case routes through eventlet's native thread pool instead.
+try:
+    import eventlet
+    from eventlet import tpool as _tpool
+    _EVENTLET_THREADS = eventlet.patcher.is_monkey_patched('thread')
+except ImportError:
+    _EVENTLET_THREADS = False
+
+_hash_executor = ThreadPoolExecutor(max_workers=os.cpu_count() or 4)
+
+def _run_hash(func, *args):
+    """Run a hash call on a real OS thread and return its result"""
+    if _EVENTLET_THREADS:
+        return _tpool.execute(func, *args)
+    return _hash_executor.submit(func, *args).result()
+
+# OTP SMS sends are fire-and-forget on this pool: the provider HTTP
+# call takes hundreds of milliseconds and the user only needs the form
+# acknowledged, not proof of delivery
+_sms_executor = ThreadPoolExecutor(max_workers=2)
+
 class AuthenticationManager:
     def __init__(self):
         self.otp_service = OTPService()
 
     def hash_password(self, password):
-        """Hash password using bcrypt"""
-        return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+        """Hash password using Argon2id at the configured parameters"""
+        return _run_hash(password_hasher.hash, password)
 
-    def verify_password(self, password, hashed):
-        """Verify password against hash"""
+    def _verify_password_inline(self, password, hashed):
+        """Run the actual hash comparison (called on the hash pool)"""
+        if hashed.startswith('$argon2'):
+            try:
+                return password_hasher.verify(hashed, password)
+            except (VerifyMismatchError, InvalidHashError):
+                return False
         return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
 
+    def verify_password(self, password, hashed):
+        """Verify password against an Argon2 or legacy bcrypt hash"""
+        return _run_hash(self._verify_password_inline, password, hashed)
+
+    def needs_rehash(self, hashed):
+        """Check if a stored hash should be upgraded to current parameters"""
+        if not hashed.startswith('$argon2'):
+            return True
+        return password_hasher.check_needs_rehash(hashed)
+
     def generate_otp(self):
         """Generate 6-digit OTP"""
         return str(secrets.randbelow(900000) + 100000)
 
+    @staticmethod
+    def _log_sms_result(mobile_number, future):
+        """Report the outcome of a backgrounded SMS send"""
+        try:
+            if future.result():
+                logger.info(f"OTP sent successfully to {mobile_number}")
+            else:
+                logger.error(f"Failed to send OTP SMS to {mobile_number}")
+        except Exception as e:
+            logger.error(f"Error sending OTP SMS to {mobile_number}: {e}")
+
     def send_otp(self, mobile_number):
         """Send OTP to mobile number"""
         try:
@@ -39,13 +106,13 @@ class AuthenticationManager:
             result = db.execute_query(query, (mobile_number, otp_code, expires_at))
             
             if result:
-                # Send OTP via SMS (using Twilio)
-                success = self.otp_service.send_sms(mobile_number, otp_code)
-                if success:
-                    logger.info(f"OTP sent successfully to {mobile_number}")
-                    return True, "OTP sent successfully"
-                else:
-                    return False, "Failed to send OTP"
+                # Send OTP via SMS (using Twilio) in the background so
+                # the response doesn't wait on the provider round trip
+                future = _sms_executor.submit(self.otp_service.send_sms, mobile_number, otp_code)
+                future.add_done_callback(
+                    functools.partial(self._log_sms_result, mobile_number)
+                )
+                return True, "OTP sent successfully"
             else:
                 return False, "Failed to store OTP"
                 
@@ -56,59 +123,91 @@ class AuthenticationManager:
     def verify_otp(self, mobile_number, otp_code):
         """Verify OTP code"""
         try:
-            query = '''
-                SELECT * FROM otp_verification 
-                WHERE mobile_number = %s AND otp_code = %s AND is_used = FALSE
+            # Verify and consume in one atomic statement: the WHERE
+            # clause carries the expiry and used checks, so the old
+            # SELECT-check-UPDATE sequence (and its window for two
+            # verifications to both succeed) collapses to one round trip
+            consume_query = '''
+                UPDATE otp_verification SET is_used = TRUE
+                WHERE mobile_number = %s AND otp_code = %s
+                AND is_used = FALSE AND expires_at > NOW()
+            '''
+            result = db.execute_query(consume_query, (mobile_number, otp_code))
+
+            if result:
+                return True, "OTP verified successfully"
+
+            # Only on failure, one cheap lookup to tell expired from wrong
+            expiry_query = '''
+                SELECT expires_at FROM otp_verification
+                WHERE mobile_number = %s AND otp_code = %s
                 ORDER BY created_at DESC LIMIT 1
             '''
-            result = db.execute_query(query, (mobile_number, otp_code))
-            
-            if not result:
-                return False, "Invalid OTP"
-            
-            otp_record = result[0]
-            
-            # Check if OTP is expired
-            if datetime.now() > otp_record['expires_at']:
+            match = db.execute_query(expiry_query, (mobile_number, otp_code))
+            if match and datetime.now() > match[0]['expires_at']:
                 return False, "OTP expired"
-            
-            # Mark OTP as used
-            update_query = '''
-                UPDATE otp_verification SET is_used = TRUE 
-                WHERE id = %s
-            '''
-            db.execute_query(update_query, (otp_record['id'],))
-            
-            return True, "OTP verified successfully"
-            
+            return False, "Invalid OTP"
+
         except Exception as e:
             logger.error(f"Error verifying OTP: {e}")
             return False, "Error verifying OTP"
 
+    @staticmethod
+    @functools.lru_cache(maxsize=1)
+    def _mobile_unique_key_present():
+        """Whether users.mobile_number carries uk_users_mobile.
+
+        ensure_schema() adds the key, but it can't on a database that
+        already holds duplicate mobiles - and without it the ON
+        DUPLICATE KEY dedup in register_user would happily insert a
+        second row for the same mobile. Probed once and cached.
+        """
+        rows = db.execute_query(
+            '''SELECT 1 FROM information_schema.STATISTICS
+               WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'users'
+               AND INDEX_NAME = 'uk_users_mobile' LIMIT 1'''
+        )
+        return bool(rows)
+
     def register_user(self, name, enrollment_no, mobile_number, role='student'):
         """Register new user"""
         try:
-            # Check if user already exists
-            check_query = '''
-                SELECT id FROM users WHERE enrollment_no = %s OR mobile_number = %s
-            '''
-            existing = db.execute_query(check_query, (enrollment_no, mobile_number))
-            
-            if existing:
-                return False, "User already exists with this enrollment number or mobile"
-            
-            # Insert new user
+            # One round trip instead of SELECT-then-INSERT: the unique
+            # keys on enrollment_no and mobile_number make a duplicate a
+            # no-op UPDATE, which reports rowcount 0 - also closes the
+            # race where two registrations pass the old existence check.
+            # The single statement is only correct when both keys exist,
+            # so fall back to the explicit check if uk_users_mobile is
+            # missing rather than silently duplicating mobiles.
+            if not self._mobile_unique_key_present():
+                existing = db.execute_query(
+                    'SELECT id FROM users WHERE enrollment_no = %s OR mobile_number = %s',
+                    (enrollment_no, mobile_number)
+                )
+                if existing:
+                    return False, "User already exists with this enrollment number or mobile"
+                result = db.execute_query(
+                    'INSERT INTO users (name, enrollment_no, mobile_number, role) VALUES (%s, %s, %s, %s)',
+                    (name, enrollment_no, mobile_number, role)
+                )
+                if result:
+                    return True, "User registered successfully"
+                return False, "Failed to register user"
+
             insert_query = '''
                 INSERT INTO users (name, enrollment_no, mobile_number, role)
                 VALUES (%s, %s, %s, %s)
+                ON DUPLICATE KEY UPDATE id = id
             '''
             result = db.execute_query(insert_query, (name, enrollment_no, mobile_number, role))
-            
+
             if result:
                 return True, "User registered successfully"
+            elif result == 0:
+                return False, "User already exists with this enrollment number or mobile"
             else:
                 return False, "Failed to register user"
-                
+
         except Exception as e:
             logger.error(f"Error registering user: {e}")
             return False, "Error registering user"
@@ -128,6 +227,13 @@ class AuthenticationManager:
             user = result[0]
             
             if user['password_hash'] and self.verify_password(password, user['password_hash']):
+                # Transparently upgrade legacy bcrypt (or outdated Argon2)
+                # hashes now that we have the plaintext
+                if self.needs_rehash(user['password_hash']):
+                    db.execute_query(
+                        'UPDATE users SET password_hash = %s WHERE id = %s',
+                        (self.hash_password(password), user['id'])
+                    )
                 return True, user, "Authentication successful"
             else:
                 return False, None, "Invalid credentials"
@@ -154,5 +260,10 @@ class AuthenticationManager:
             logger.error(f"Error verifying user: {e}")
             return False, "Error verifying user"
 
+@functools.lru_cache(maxsize=1)
+def get_auth():
+    """Return the shared AuthenticationManager singleton"""
+    return AuthenticationManager()
+
 # Initialize authentication manager
-auth_manager = AuthenticationManager()
\ No newline at end of file
+auth_manager = get_auth()
\ No newline at end of file
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Calibrate the password-hashing cost for this host
+
+Logins hash with Argon2id (auth/authentication.py), so the main sweep
+times argon2.PasswordHasher at increasing time_cost for a few memory
+sizes and recommends the strongest profile that keeps one hash under
+the latency budget. Set the result as ARGON2_TIME_COST and
+ARGON2_MEMORY_COST in .env so logins pay a predictable,
+host-appropriate hashing cost instead of whatever the env defaults
+happen to be. A second, cheaper bcrypt sweep covers BCRYPT_ROUNDS_SEED,
+which the seed scripts use for throwaway fixture passwords.
+"""
+
+import time
+import bcrypt
+from argon2 import PasswordHasher
+
+# Target time for one login hash/verify on the deploying host (seconds)
+LATENCY_BUDGET = 0.25
+
+# Seed scripts hash placeholder passwords; keep those much cheaper
+SEED_LATENCY_BUDGET = 0.05
+
+# Memory sizes to try, in KiB: the OWASP 19 MiB baseline plus 46 MiB
+# and 64 MiB for hosts with headroom
+MEMORY_COSTS = (19456, 47104, 65536)
+MAX_TIME_COST = 10
+
+MIN_ROUNDS = 4
+MAX_ROUNDS = 16
+
+def time_argon2(time_cost, memory_cost, samples=3):
+    """Return the average seconds for one Argon2id hash at these parameters"""
+    hasher = PasswordHasher(time_cost=time_cost, memory_cost=memory_cost, parallelism=1)
+    total = 0.0
+    for _ in range(samples):
+        start = time.perf_counter()
+        hasher.hash("calibration-password")
+        total += time.perf_counter() - start
+    return total / samples
+
+def time_rounds(rounds, samples=3):
+    """Return the average seconds for one bcrypt hash at the given cost factor"""
+    total = 0.0
+    for _ in range(samples):
+        start = time.perf_counter()
+        bcrypt.hashpw(b"calibration-password", bcrypt.gensalt(rounds=rounds))
+        total += time.perf_counter() - start
+    return total / samples
+
+def calibrate_argon2():
+    """Find the strongest Argon2id profile inside the latency budget"""
+    print("🔐 Calibrating Argon2id parameters (login hashing)...")
+    print(f"   Latency budget: {LATENCY_BUDGET * 1000:.0f} ms per hash\n")
+
+    # OWASP floor as the fallback if even it blows the budget
+    best_time, best_memory = 2, 19456
+    for memory_cost in MEMORY_COSTS:
+        fitting_time = 0
+        for time_cost in range(1, MAX_TIME_COST + 1):
+            elapsed = time_argon2(time_cost, memory_cost)
+            print(f"   m={memory_cost:5d} KiB t={time_cost:2d}: {elapsed * 1000:7.1f} ms")
+            if elapsed > LATENCY_BUDGET:
+                break
+            fitting_time = time_cost
+        # Prefer more memory over more iterations - memory is what
+        # makes Argon2 expensive on cracking hardware
+        if fitting_time:
+            best_time, best_memory = fitting_time, memory_cost
+
+    print(f"\n✅ Recommended Argon2id profile: t={best_time}, m={best_memory} KiB")
+    print(f"   Add to your .env file: ARGON2_TIME_COST={best_time}")
+    print(f"                          ARGON2_MEMORY_COST={best_memory}")
+    return best_time, best_memory
+
+def calibrate_bcrypt_seed():
+    """Find the bcrypt cost for the seed scripts' fixture passwords"""
+    print("\n🔐 Calibrating bcrypt seed cost (create_faculty.py etc.)...")
+    print(f"   Latency budget: {SEED_LATENCY_BUDGET * 1000:.0f} ms per hash\n")
+
+    best = MIN_ROUNDS
+    for rounds in range(MIN_ROUNDS, MAX_ROUNDS + 1):
+        elapsed = time_rounds(rounds)
+        print(f"   rounds={rounds:2d}: {elapsed * 1000:7.1f} ms")
+        if elapsed <= SEED_LATENCY_BUDGET:
+            best = rounds
+        else:
+            break
+
+    print(f"\n✅ Recommended seed cost factor: {best}")
+    print(f"   Add to your .env file: BCRYPT_ROUNDS_SEED={best}")
+    print("   (set HASH_FAST=1 when seeding test data to skip the full cost)")
+    return best
+
+def calibrate():
+    time_cost, memory_cost = calibrate_argon2()
+    seed_rounds = calibrate_bcrypt_seed()
+    return time_cost, memory_cost, seed_rounds
+
+if __name__ == "__main__":
+    calibrate()
@@ -3,58 +3,56 @@
 
 from database.database import db
 
+QR_COLUMNS = {
+    'qr_session_id': 'ALTER TABLE attendance ADD COLUMN qr_session_id VARCHAR(255) NULL',
+    'marked_by_qr': 'ALTER TABLE attendance ADD COLUMN marked_by_qr TINYINT(1) DEFAULT 0',
+}
+
+COLUMNS_QUERY = '''
+    SELECT COLUMN_NAME FROM INFORMATION_SCHEMA.COLUMNS
+    WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'attendance'
+    AND COLUMN_NAME IN ('qr_session_id', 'marked_by_qr')
+'''
+
+def _existing_columns():
+    """One information_schema query instead of a probe SELECT per column"""
+    rows = db.execute_query(COLUMNS_QUERY)
+    return {row['COLUMN_NAME'] for row in rows or []}
+
 def check_attendance_schema():
     if db.connect():
-        # Check if QR columns exist by trying to select them
-        qr_columns = ['qr_session_id', 'marked_by_qr']
-        existing_columns = []
-        
-        for col in qr_columns:
-            try:
-                # Try to select the column - if it exists, no error
-                result = db.execute_query(f'SELECT {col} FROM attendance LIMIT 1')
-                if result is not None:
-                    existing_columns.append(col)
-                    print(f"✅ Column '{col}' exists")
-            except Exception as e:
-                print(f"❌ Column '{col}' missing: {str(e)}")
-        
-        missing_columns = [col for col in qr_columns if col not in existing_columns]
-        
-        if missing_columns:
+        existing = _existing_columns()
+        for col in QR_COLUMNS:
+            if col in existing:
+                print(f"✅ Column '{col}' exists")
+            else:
+                print(f"❌ Column '{col}' missing")
+
+        missing = set(QR_COLUMNS) - existing
+        if missing:
             print('\n🔧 Adding missing QR columns to attendance table...')
-            for col in missing_columns:
+            for col in missing:
                 try:
-                    if col == 'qr_session_id':
-                        query = 'ALTER TABLE attendance ADD COLUMN qr_session_id VARCHAR(255) NULL'
-                        result = db.execute_query(query)
-                        print(f"✅ Added column: {col}")
-                    elif col == 'marked_by_qr':
-                        query = 'ALTER TABLE attendance ADD COLUMN marked_by_qr TINYINT(1) DEFAULT 0'
-                        result = db.execute_query(query)
-                        print(f"✅ Added column: {col}")
+                    db.execute_query(QR_COLUMNS[col])
+                    print(f"✅ Added column: {col}")
                 except Exception as e:
                     print(f"❌ Failed to add column {col}: {str(e)}")
-        
+
         # Verify all columns exist now
         print('\n📋 Final verification:')
+        existing = _existing_columns()
         all_exist = True
-        for col in qr_columns:
-            try:
-                result = db.execute_query(f'SELECT {col} FROM attendance LIMIT 1')
-                if result is not None:
-                    print(f"✅ {col}: Ready")
-                else:
-                    print(f"❌ {col}: Still missing")
-                    all_exist = False
-            except Exception as e:
-                print(f"❌ {col}: Error - {str(e)}")
+        for col in QR_COLUMNS:
+            if col in existing:
+                print(f"✅ {col}: Ready")
+            else:
+                print(f"❌ {col}: Still missing")
                 all_exist = False
-        
+
         return all_exist
     else:
         print('❌ Failed to connect to database')
         return False
 
 if __name__ == '__main__':
-    check_attendance_schema()
\ No newline at end of file
+    check_attendance_schema()
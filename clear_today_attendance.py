@@ -12,14 +12,14 @@ def clear_today_attendance():
     """Clear all attendance records for today"""
     try:
         # Clear today's attendance
-        delete_query = "DELETE FROM attendance WHERE DATE(attendance_date) = CURDATE()"
+        delete_query = "DELETE FROM attendance WHERE attendance_date = CURDATE()"
         result = db.execute_query(delete_query)
         
         if result is not None:
             logger.info("Successfully cleared today's attendance records")
             
             # Check remaining records
-            count_query = "SELECT COUNT(*) as count FROM attendance WHERE DATE(attendance_date) = CURDATE()"
+            count_query = "SELECT COUNT(*) as count FROM attendance WHERE attendance_date = CURDATE()"
             count_result = db.execute_query(count_query)
             
             if count_result:
@@ -38,20 +38,29 @@ def show_current_attendance():
     """Show current attendance records"""
     try:
         query = """
-            SELECT u.name, u.enrollment_no, a.attendance_date, a.attendance_time, 
-                   a.subject, a.marked_by_face, a.marked_by_rfid
-            FROM attendance a 
-            JOIN users u ON a.user_id = u.id 
-            WHERE DATE(a.attendance_date) = CURDATE()
+            SELECT u.name, u.enrollment_no, a.attendance_date, a.attendance_time,
+                   a.subject,
+                   CASE
+                       WHEN a.marked_by_face THEN 'Face'
+                       WHEN a.marked_by_rfid THEN 'RFID'
+                       ELSE 'Manual'
+                   END as method
+            FROM attendance a
+            JOIN users u ON a.user_id = u.id
+            WHERE a.attendance_date = CURDATE()
             ORDER BY a.attendance_time DESC
         """
-        result = db.execute_query(query)
-        
-        if result:
-            logger.info(f"Current attendance records for today ({len(result)} records):")
-            for record in result:
-                method = "Face" if record['marked_by_face'] else "RFID" if record['marked_by_rfid'] else "Manual"
-                logger.info(f"  - {record['name']} ({record['enrollment_no']}) - {record['subject']} - {record['attendance_time']} - {method}")
+        # Stream rows from a server-side cursor so a big cohort's
+        # records print as they arrive instead of buffering in memory
+        count = 0
+        for record in db.stream_query(query):
+            if count == 0:
+                logger.info("Current attendance records for today:")
+            count += 1
+            logger.info(f"  - {record['name']} ({record['enrollment_no']}) - {record['subject']} - {record['attendance_time']} - {record['method']}")
+
+        if count:
+            logger.info(f"Total: {count} records")
         else:
             logger.info("No attendance records found for today")
             
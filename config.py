@@ -19,6 +19,9 @@ class Config:
     PERMANENT_SESSION_LIFETIME = timedelta(minutes=30)  # Session expires after 30 minutes
     SESSION_TYPE = 'filesystem'
     SESSION_PERMANENT = False  # Sessions are not permanent
+
+    # Redis Configuration (server-side sessions, caching)
+    REDIS_URL = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
     
     # Twilio Configuration (for OTP)
     TWILIO_ACCOUNT_SID = os.getenv('TWILIO_ACCOUNT_SID', 'your_twilio_sid') # future work
@@ -26,6 +29,23 @@ class Config:
     TWILIO_PHONE_NUMBER = os.getenv('TWILIO_PHONE_NUMBER', '+919898656532') # Temporary number not for purpose
     
     # Security Configuration
+    # Password hashing cost - calibrate with calibrate_hash_cost.py
+    # (logins use the ARGON2_* profile; bcrypt only covers legacy
+    # hashes and the seed scripts). HASH_FAST=1 drops everything to the
+    # minimum for seed/test scripts.
+    if os.getenv('HASH_FAST', 'False').lower() in ('1', 'true'):
+        BCRYPT_ROUNDS = 4
+        BCRYPT_ROUNDS_SEED = 4
+        ARGON2_TIME_COST = 1
+        ARGON2_MEMORY_COST = 8
+    else:
+        BCRYPT_ROUNDS = int(os.getenv('BCRYPT_ROUNDS', '12'))
+        # Lower cost for seed scripts hashing throwaway placeholder
+        # passwords; login paths keep the full BCRYPT_ROUNDS
+        BCRYPT_ROUNDS_SEED = int(os.getenv('BCRYPT_ROUNDS_SEED', '10'))
+        # OWASP-recommended Argon2id profile (t=2, m=19 MiB)
+        ARGON2_TIME_COST = int(os.getenv('ARGON2_TIME_COST', '2'))
+        ARGON2_MEMORY_COST = int(os.getenv('ARGON2_MEMORY_COST', '19456'))
     OTP_EXPIRY_SECONDS = 60
     FACE_RECOGNITION_TOLERANCE = 0.6
     MAX_LOGIN_ATTEMPTS = 5
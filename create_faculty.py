@@ -6,6 +6,9 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from concurrent.futures import ProcessPoolExecutor
+
+from config import Config
 from database.database import db
 from database.timetable_data import FACULTY_MAPPING
 import bcrypt
@@ -65,41 +68,71 @@ FACULTY_DATA = [
     }
 ]
 
+def _hash_one(password):
+    """Hash one seed password (runs in the pool's worker processes)"""
+    salt = bcrypt.gensalt(rounds=Config.BCRYPT_ROUNDS_SEED)
+    return bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
+
 def create_faculty():
     """Create faculty members"""
     try:
         db.connect()
-        
+
+        # One IN-list lookup for all existing faculty instead of a
+        # SELECT round trip per entry
+        faculty_ids = [faculty['faculty_id'] for faculty in FACULTY_DATA]
+        placeholders = ', '.join(['%s'] * len(faculty_ids))
+        existing_rows = db.execute_query(
+            f"SELECT faculty_id FROM users WHERE faculty_id IN ({placeholders})",
+            tuple(faculty_ids)
+        )
+        existing = {row['faculty_id'] for row in existing_rows or []}
+
+        missing = []
         for faculty in FACULTY_DATA:
-            # Check if faculty exists
-            check_query = "SELECT id FROM users WHERE faculty_id = %s"
-            existing = db.execute_query(check_query, (faculty['faculty_id'],))
-            
-            if existing:
+            if faculty['faculty_id'] in existing:
                 logger.info(f"Faculty {faculty['faculty_id']} - {faculty['name']} already exists, skipping...")
-                continue
-            
-            # Hash password
-            password_hash = bcrypt.hashpw(faculty['password'].encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
-            
-            # Insert faculty
+            else:
+                missing.append(faculty)
+
+        if missing:
+            # One multi-row INSERT IGNORE inside a single transaction;
+            # executemany collapses the rows into one VALUES list and
+            # IGNORE keeps a concurrent duplicate from aborting the batch
             insert_query = """
-                INSERT INTO users 
+                INSERT IGNORE INTO users
                 (name, faculty_id, mobile_number, role, password_hash, department, is_verified, is_approved)
                 VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
             """
-            db.execute_query(insert_query, (
-                faculty['name'],
-                faculty['faculty_id'],
-                faculty['mobile'],
-                'faculty',
-                password_hash,
-                faculty['department'],
-                True,
-                True
-            ))
-            logger.info(f"✅ Created faculty: {faculty['faculty_id']} - {faculty['name']}")
-        
+            # bcrypt is a couple hundred ms of pure CPU per password, so
+            # hash across cores instead of serially through one
+            with ProcessPoolExecutor() as executor:
+                hashes = list(executor.map(_hash_one, [f['password'] for f in missing]))
+
+            rows = []
+            for faculty, password_hash in zip(missing, hashes):
+                rows.append((
+                    faculty['name'],
+                    faculty['faculty_id'],
+                    faculty['mobile'],
+                    'faculty',
+                    password_hash,
+                    faculty['department'],
+                    True,
+                    True
+                ))
+
+            db.begin()
+            inserted = db.execute_many(insert_query, rows)
+            if inserted is None:
+                db.rollback()
+                logger.error("❌ Batch insert failed, rolled back")
+                return False
+            db.commit()
+
+            for faculty in missing:
+                logger.info(f"✅ Created faculty: {faculty['faculty_id']} - {faculty['name']}")
+
         logger.info("\n✅ All faculty members created successfully!")
         print("\n" + "="*80)
         print("📋 FACULTY LOGIN CREDENTIALS")
@@ -1,66 +1,303 @@
+import csv
+import functools
+import os
+import tempfile
 import pymysql
 from pymysql import Error
+from pymysql.constants import CLIENT
 from config import Config
 import logging
+import queue
+import threading
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+class ConnectionPool:
+    """Thread-safe pool of PyMySQL connections.
+
+    Connections are created lazily up to max_connections and reused
+    across DatabaseManager instances, so repeated connect()/disconnect()
+    cycles don't pay the TCP+auth handshake every time.
+    """
+
+    def __init__(self, max_connections=32):
+        self.max_connections = max_connections
+        self._idle = queue.Queue(maxsize=max_connections)
+        self._lock = threading.Lock()
+        self._created = 0
+
+    def _new_connection(self):
+        return pymysql.connect(
+            host=Config.MYSQL_HOST,
+            user=Config.MYSQL_USER,
+            password=Config.MYSQL_PASSWORD,
+            database=Config.MYSQL_DATABASE,
+            charset='utf8mb4',
+            autocommit=True,
+            # Allow several ;-separated statements per round trip so
+            # batch callers can pipeline instead of paying one RTT each
+            client_flag=CLIENT.MULTI_STATEMENTS,
+            local_infile=True
+        )
+
+    def acquire(self):
+        """Get a pooled connection, creating one if the pool isn't full yet"""
+        try:
+            connection = self._idle.get_nowait()
+            connection.ping(reconnect=True)
+            return connection
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            if self._created < self.max_connections:
+                self._created += 1
+                return self._new_connection()
+
+        # Pool exhausted - wait for a connection to be returned
+        connection = self._idle.get()
+        connection.ping(reconnect=True)
+        return connection
+
+    def release(self, connection):
+        """Return a connection to the pool (closed ones are discarded)"""
+        if connection and connection.open:
+            try:
+                self._idle.put_nowait(connection)
+                return
+            except queue.Full:
+                connection.close()
+        with self._lock:
+            self._created -= 1
+
+# Shared pool used by every DatabaseManager instance
+pool = ConnectionPool()
+
 class DatabaseManager:
+    """Query-scoped facade over the shared connection pool.
+
+    Every statement checks a connection out of the pool and returns it
+    in a finally, so concurrent threads and greenlets never interleave
+    packets on one PyMySQL connection (the driver is not thread-safe).
+    A connection is only pinned to the manager between begin() and
+    commit()/rollback(), for the scripts that need an explicit
+    multi-statement transaction.
+    """
+
     def __init__(self):
         self.host = Config.MYSQL_HOST
         self.user = Config.MYSQL_USER
         self.password = Config.MYSQL_PASSWORD
         self.database = Config.MYSQL_DATABASE
+        # Pinned transaction connection; None outside begin()/commit()
         self.connection = None
 
     def connect(self):
-        """Establish database connection"""
+        """Health-check the pool by cycling a connection through it"""
         try:
-            logger.info("Attempting database connection with PyMySQL")
-            self.connection = pymysql.connect(
-                host=self.host,
-                user=self.user,
-                password=self.password,
-                database=self.database,
-                charset='utf8mb4',
-                autocommit=True
-            )
-            logger.info("Successfully connected to MySQL database using PyMySQL")
+            if self.connection and self.connection.open:
+                return True
+            pool.release(pool.acquire())
             return True
         except Exception as e:
             logger.error(f"Error connecting to MySQL with PyMySQL: {e}")
             return False
 
     def disconnect(self):
-        """Close database connection"""
+        """Return the pinned transaction connection, if any, to the pool"""
+        if self.connection:
+            pool.release(self.connection)
+            self.connection = None
+
+    def _checkout(self):
+        """Connection for one statement: (connection, release_after).
+
+        Reuses the pinned connection inside an explicit transaction;
+        otherwise checks one out of the pool for just this call.
+        """
         if self.connection and self.connection.open:
-            self.connection.close()
-            logger.info("MySQL connection closed")
+            return self.connection, False
+        return pool.acquire(), True
 
     def execute_query(self, query, params=None, fetch_last_id=False):
         """Execute a query and return results"""
+        connection, release_after = None, False
         try:
-            if not self.connection or not self.connection.open:
-                self.connect()
-            
-            cursor = self.connection.cursor(pymysql.cursors.DictCursor)
+            connection, release_after = self._checkout()
+            cursor = connection.cursor(pymysql.cursors.DictCursor)
             cursor.execute(query, params or ())
-            
+
             if query.strip().upper().startswith('SELECT'):
                 result = cursor.fetchall()
             else:
                 result = cursor.rowcount
                 if fetch_last_id:
                     result = cursor.lastrowid
-                
+
             cursor.close()
             return result
         except Exception as e:
             logger.error(f"Error executing query: {e}")
-            if self.connection:
-                self.connection.rollback()
+            if connection:
+                connection.rollback()
+            return None
+        finally:
+            if release_after and connection:
+                pool.release(connection)
+
+    def stream_query(self, query, params=None):
+        """Yield result rows one at a time via a server-side cursor.
+
+        SSDictCursor leaves the result set on the server and fetches
+        rows as the caller consumes them, so a large SELECT costs one
+        row of memory instead of the full fetchall() buffer. Keep
+        execute_query for small results - the unbuffered cursor ties up
+        the checked-out connection until the rows are drained.
+        """
+        connection, release_after = None, False
+        try:
+            connection, release_after = self._checkout()
+            cursor = connection.cursor(pymysql.cursors.SSDictCursor)
+            try:
+                cursor.execute(query, params or ())
+                yield from cursor
+            finally:
+                cursor.close()
+        except Exception as e:
+            logger.error(f"Error streaming query: {e}")
+        finally:
+            if release_after and connection:
+                pool.release(connection)
+
+    def __enter__(self):
+        """Context-manager entry: start an explicit transaction"""
+        self.begin()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Commit on success, roll back on error; always unpin"""
+        if exc_type is not None:
+            self.rollback()
+        else:
+            self.commit()
+        return False
+
+    def begin(self):
+        """Start an explicit transaction on a pinned connection.
+
+        The connection stays checked out of the pool - and is reused by
+        every statement on this manager - until commit()/rollback()
+        returns it.
+        """
+        if not self.connection or not self.connection.open:
+            self.connection = pool.acquire()
+        self.connection.begin()
+
+    def commit(self):
+        """Commit the current transaction and unpin its connection"""
+        if self.connection and self.connection.open:
+            self.connection.commit()
+        self.disconnect()
+
+    def rollback(self):
+        """Roll back the current transaction and unpin its connection"""
+        if self.connection and self.connection.open:
+            self.connection.rollback()
+        self.disconnect()
+
+    def execute_many(self, query, seq_of_params):
+        """Execute a query once for a sequence of parameter tuples.
+
+        PyMySQL rewrites executemany() on an INSERT into a single
+        multi-row VALUES statement, so N rows cost one round trip.
+        """
+        connection, release_after = None, False
+        try:
+            connection, release_after = self._checkout()
+            cursor = connection.cursor(pymysql.cursors.DictCursor)
+            cursor.executemany(query, seq_of_params)
+            result = cursor.rowcount
+            cursor.close()
+            return result
+        except Exception as e:
+            logger.error(f"Error executing batch query: {e}")
+            if connection:
+                connection.rollback()
             return None
+        finally:
+            if release_after and connection:
+                pool.release(connection)
+
+    def execute_script(self, script):
+        """Execute a ;-separated batch of statements in one round trip.
+
+        Relies on CLIENT.MULTI_STATEMENTS being set on pool connections;
+        all statements go out in a single client->server flush and every
+        result set is drained before returning the last rowcount.
+        """
+        connection, release_after = None, False
+        try:
+            connection, release_after = self._checkout()
+            cursor = connection.cursor(pymysql.cursors.DictCursor)
+            cursor.execute(script)
+            result = cursor.rowcount
+            while cursor.nextset():
+                result = cursor.rowcount
+            cursor.close()
+            return result
+        except Exception as e:
+            logger.error(f"Error executing script: {e}")
+            if connection:
+                connection.rollback()
+            return None
+        finally:
+            if release_after and connection:
+                pool.release(connection)
+
+    def load_rows(self, table, columns, rows):
+        """Bulk-load rows into a table via LOAD DATA LOCAL INFILE.
+
+        Writes the rows to a temporary CSV and sends it over MySQL's
+        block-oriented bulk protocol, which skips per-row parse/plan
+        entirely - use this instead of execute_many() once a batch
+        grows past a few hundred rows.
+        """
+        csv_path = None
+        connection, release_after = None, False
+        try:
+            connection, release_after = self._checkout()
+
+            with tempfile.NamedTemporaryFile(
+                mode='w', newline='', suffix='.csv', delete=False
+            ) as csv_file:
+                csv_path = csv_file.name
+                writer = csv.writer(csv_file)
+                for row in rows:
+                    writer.writerow(['\\N' if value is None else value for value in row])
+
+            query = '''
+                LOAD DATA LOCAL INFILE %s IGNORE INTO TABLE {}
+                FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '"'
+                LINES TERMINATED BY '\\n'
+                ({})
+            '''.format(table, ', '.join(columns))
+
+            cursor = connection.cursor(pymysql.cursors.DictCursor)
+            cursor.execute(query, (csv_path,))
+            result = cursor.rowcount
+            cursor.close()
+            return result
+        except Exception as e:
+            logger.error(f"Error bulk loading into {table}: {e}")
+            if connection:
+                connection.rollback()
+            return None
+        finally:
+            if release_after and connection:
+                pool.release(connection)
+            if csv_path:
+                os.unlink(csv_path)
 
     def create_tables(self):
         """Create all necessary tables"""
@@ -109,7 +346,8 @@ class DatabaseManager:
                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                     FOREIGN KEY (user_id) REFERENCES users(id),
                     FOREIGN KEY (faculty_id) REFERENCES users(id),
-                    UNIQUE KEY unique_attendance (user_id, attendance_date, session_type, subject)
+                    UNIQUE KEY unique_attendance (user_id, attendance_date, session_type, subject),
+                    KEY idx_attendance_date (attendance_date)
                 )
             ''',
             'sessions': '''
@@ -149,8 +387,9 @@ class DatabaseManager:
     def insert_sample_data(self):
         """Insert sample admin user"""
         admin_query = '''
-            INSERT IGNORE INTO users (name, enrollment_no, mobile_number, role, password_hash, is_verified)
+            INSERT INTO users (name, enrollment_no, mobile_number, role, password_hash, is_verified)
             VALUES (%s, %s, %s, %s, %s, %s)
+            ON DUPLICATE KEY UPDATE enrollment_no = enrollment_no
         '''
         admin_data = ('System Admin', 'ADMIN001', '9999999999', 'admin', 
                      '$2b$12$LQv3c1yqBwEHxPuNY.Q.EuTDWiOuIj4lLJkFQ9B8kNnX9QK1bQ1K6', True)
@@ -158,5 +397,10 @@ class DatabaseManager:
         self.execute_query(admin_query, admin_data)
         logger.info("Sample admin user created (default password: admin123)")
 
+@functools.lru_cache(maxsize=1)
+def get_db():
+    """Return the shared DatabaseManager singleton"""
+    return DatabaseManager()
+
 # Initialize database
-db = DatabaseManager()
\ No newline at end of file
+db = get_db()
\ No newline at end of file
@@ -3,6 +3,9 @@ Timetable Data for Semester VII, Class A
 Based on the provided timetable image
 """
 
+import re
+from collections import namedtuple
+
 TIMETABLE_DATA = {
     'semester': 'VII',
     'class_name': 'A',
@@ -207,3 +210,35 @@ FACULTY_MAPPING = {
     'VP': 'FAC005',
     'BP': 'FAC006'
 }
+
+# Faculty names carry their short code as a "(CODE)" suffix; compiled
+# once here so callers don't substring-parse each name
+FACULTY_CODE_RE = re.compile(r'\(([A-Z&]+)\)$')
+
+# Lookup indexes built once at import, so schedule queries are a dict
+# hit instead of a scan over the schedule list
+SCHEDULE_INDEX = {
+    (entry['day'], entry['time_slot']): entry['courses']
+    for entry in TIMETABLE_DATA['schedule']
+}
+
+SCHEDULE_BY_DAY = {}
+for _entry in TIMETABLE_DATA['schedule']:
+    SCHEDULE_BY_DAY.setdefault(_entry['day'], []).append(_entry)
+
+def get_courses(day, time_slot):
+    """Courses taught in a (day, time_slot) cell, [] for a free slot"""
+    return SCHEDULE_INDEX.get((day, time_slot), [])
+
+# Flat one-row-per-course view of the nested schedule. Namedtuples keep
+# their fields in a fixed slot array rather than a dict per course, so
+# whole-table scans ("all of VM's slots") are a plain comprehension over
+# compact rows instead of nested dict chasing.
+ScheduleEntry = namedtuple('ScheduleEntry', ['day', 'time_slot', 'course_code', 'section', 'faculty'])
+
+FLAT_SCHEDULE = tuple(
+    ScheduleEntry(entry['day'], entry['time_slot'],
+                  course['course_code'], course['section'], course['faculty'])
+    for entry in TIMETABLE_DATA['schedule']
+    for course in entry['courses']
+)
@@ -6,11 +6,21 @@ Provides signup functionality for Admin, Faculty, and Students
 from flask import Blueprint, render_template, request, redirect, url_for, session, flash, jsonify
 from database.database import db
 from auth.authentication import auth_manager
+from config import Config
 from utils.otp_service import otp_service
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Redis handle for dropping the cached student headcount when a new
+# student registers; harmless no-op when Redis is unavailable
+try:
+    import redis
+    _redis_cache = redis.from_url(Config.REDIS_URL)
+    _redis_cache.ping()
+except Exception:
+    _redis_cache = None
+
 # Create blueprint for enhanced registration
 enhanced_registration = Blueprint('enhanced_registration', __name__)
 
@@ -214,6 +224,11 @@ def create_user_account(registration_data):
         
         if result:
             logger.info(f"Successfully created {role} account: {name}")
+            if role == 'student' and _redis_cache is not None:
+                try:
+                    _redis_cache.delete('stats:total_students')
+                except Exception as e:
+                    logger.warning(f"Could not invalidate student count cache: {e}")
             return True, "Account created successfully"
         else:
             logger.error(f"Database query failed - result: {result}")
@@ -216,15 +216,25 @@ class FaceProcessor:
             logger.error(f"Error in camera face recognition: {e}")
             return False, None, f"Error during recognition: {str(e)}"
     
+    def decode_image(self, image_data):
+        """Open a face image passed as raw bytes or a base64 data URL.
+
+        Raw bytes (multipart uploads) skip the base64 decode entirely;
+        data-URL strings keep working for older clients.
+        """
+        if isinstance(image_data, (bytes, bytearray)):
+            return Image.open(io.BytesIO(image_data))
+        image_bytes = base64.b64decode(image_data.split(',')[1])  # Remove data:image/jpeg;base64, prefix
+        return Image.open(io.BytesIO(image_bytes))
+
     def verify_face_from_image(self, image_data, expected_user_id):
         """Verify that the face in the image matches the expected user"""
         try:
             if not self.known_face_encodings:
                 return False, None, "No known faces in database"
-            
-            # Convert base64 image to OpenCV format
-            image_bytes = base64.b64decode(image_data.split(',')[1])  # Remove data:image/jpeg;base64, prefix
-            image = Image.open(io.BytesIO(image_bytes))
+
+            # Convert the image to OpenCV format
+            image = self.decode_image(image_data)
             opencv_image = cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGR)
             
             # Extract features from the image
@@ -262,8 +272,7 @@ class FaceProcessor:
         """Store face encoding for a new user during registration"""
         try:
             # Decode captured image
-            image_data = base64.b64decode(captured_image_data.split(',')[1])
-            image = Image.open(io.BytesIO(image_data))
+            image = self.decode_image(captured_image_data)
             image_array = np.array(image)
             
             # Convert RGB to BGR for OpenCV
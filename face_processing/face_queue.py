@@ -0,0 +1,68 @@
+"""
+Redis-backed queue for offloading face verification
+
+verify_face_from_image blocks a Flask worker for the full model
+inference (hundreds of ms). When Redis is available, requests are
+pushed onto a list consumed by face_worker.py - which drains them in
+coalesced batches - and the route thread just waits on its result
+key. Without Redis (or if the worker is down) the call degrades to
+the in-process verification it replaces.
+"""
+
+import base64
+import json
+import logging
+import uuid
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+QUEUE_KEY = 'face_verify_queue'
+RESULT_KEY = 'face_verify_result:{}'
+RESULT_TIMEOUT = 5  # seconds to wait for the worker before falling back
+
+try:
+    import redis
+    _redis = redis.from_url(Config.REDIS_URL)
+    _redis.ping()
+except Exception as e:
+    logger.warning(f"Face queue disabled ({e}); verifying faces in-process")
+    _redis = None
+
+def _verify_in_process(image_data, expected_user_id):
+    """Fallback path: run the model in this process.
+
+    The import is deferred so that merely importing this module (which
+    the app does at startup) never loads the face-recognition stack.
+    """
+    from face_processing.face_processor import face_processor
+    return face_processor.verify_face_from_image(image_data, expected_user_id)
+
+def verify_face(image_data, expected_user_id):
+    """Verify a face image, via the worker queue when available"""
+    if _redis is None:
+        return _verify_in_process(image_data, expected_user_id)
+
+    try:
+        request_id = uuid.uuid4().hex
+        # Raw image bytes (multipart uploads) are base64-wrapped for the
+        # JSON transport; the worker unwraps them back to bytes
+        binary = isinstance(image_data, (bytes, bytearray))
+        _redis.lpush(QUEUE_KEY, json.dumps({
+            'request_id': request_id,
+            'user_id': expected_user_id,
+            'binary': binary,
+            'image_data': base64.b64encode(image_data).decode('ascii') if binary else image_data
+        }))
+        result = _redis.brpop(RESULT_KEY.format(request_id), timeout=RESULT_TIMEOUT)
+    except Exception as e:
+        logger.warning(f"Face queue error ({e}); verifying in-process")
+        return _verify_in_process(image_data, expected_user_id)
+
+    if result is None:
+        logger.warning("Face worker timed out; verifying in-process")
+        return _verify_in_process(image_data, expected_user_id)
+
+    payload = json.loads(result[1])
+    return payload['success'], payload.get('user'), payload['message']
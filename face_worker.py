@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Background worker for face verification
+
+Drains verification requests that the web tier pushes onto the Redis
+queue (see face_processing/face_queue.py), processes them in coalesced
+batches so model overhead is amortized across concurrent check-ins,
+and publishes each result under the request's result key.
+
+Run alongside the app: python face_worker.py
+"""
+
+import base64
+import json
+import time
+
+import redis
+
+from config import Config
+from face_processing.face_queue import QUEUE_KEY, RESULT_KEY
+from face_processing.face_processor import face_processor
+
+BATCH_SIZE = 8
+RESULT_TTL = 30  # seconds before an unclaimed result expires
+
+def drain_batch(conn):
+    """Block for one request, then greedily coalesce up to BATCH_SIZE"""
+    item = conn.brpop(QUEUE_KEY, timeout=1)
+    if item is None:
+        return []
+    batch = [json.loads(item[1])]
+    while len(batch) < BATCH_SIZE:
+        extra = conn.rpop(QUEUE_KEY)
+        if extra is None:
+            break
+        batch.append(json.loads(extra))
+    return batch
+
+def run_worker():
+    conn = redis.from_url(Config.REDIS_URL)
+    print("✅ Face worker started, waiting for verification requests...")
+
+    while True:
+        batch = drain_batch(conn)
+        if not batch:
+            continue
+
+        started = time.perf_counter()
+        for request in batch:
+            image_data = request['image_data']
+            if request.get('binary'):
+                image_data = base64.b64decode(image_data)
+            success, user, message = face_processor.verify_face_from_image(
+                image_data, request['user_id']
+            )
+            result_key = RESULT_KEY.format(request['request_id'])
+            conn.lpush(result_key, json.dumps({
+                'success': success,
+                'user': user,
+                'message': message
+            }, default=str))
+            conn.expire(result_key, RESULT_TTL)
+
+        elapsed = (time.perf_counter() - started) * 1000
+        print(f"✅ Verified batch of {len(batch)} in {elapsed:.0f} ms")
+
+if __name__ == "__main__":
+    try:
+        run_worker()
+    except KeyboardInterrupt:
+        print("\n👋 Face worker stopped")
@@ -7,7 +7,7 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from database.database import db
-from database.timetable_data import TIMETABLE_DATA, COURSES, FACULTY_MAPPING
+from database.timetable_data import TIMETABLE_DATA, COURSES, FACULTY_MAPPING, FACULTY_CODE_RE
 import logging
 
 logging.basicConfig(level=logging.INFO)
@@ -118,9 +118,9 @@ def import_courses():
 def get_faculty_id(faculty_name):
     """Get faculty ID from faculty name"""
     # Extract faculty code from name like "Ms. Purvi Patel(PCP)"
-    if '(' in faculty_name and ')' in faculty_name:
-        code = faculty_name.split('(')[1].split(')')[0]
-        faculty_id = FACULTY_MAPPING.get(code)
+    match = FACULTY_CODE_RE.search(faculty_name)
+    if match:
+        faculty_id = FACULTY_MAPPING.get(match.group(1))
         
         if faculty_id:
             # Check if faculty exists in database
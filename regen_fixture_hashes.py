@@ -0,0 +1,24 @@
+#!/usr/bin/env python3
+"""
+Regenerate the pre-computed fixture password hashes
+
+Prints a fresh FIXTURE_HASHES dict for add_test_data.py. Run this
+whenever the Argon2 parameters in config change (Argon2 salts every
+hash, so the values differ between runs - that's fine for fixtures).
+"""
+
+from auth.authentication import get_auth
+
+FIXTURE_PASSWORDS = ("faculty123", "student123", "admin123")
+
+def regen_fixture_hashes():
+    auth = get_auth()
+
+    print("# Paste into add_test_data.py:")
+    print("FIXTURE_HASHES = {")
+    for password in FIXTURE_PASSWORDS:
+        print(f'    "{password}": "{auth.hash_password(password)}",')
+    print("}")
+
+if __name__ == "__main__":
+    regen_fixture_hashes()
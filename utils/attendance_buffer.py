@@ -0,0 +1,128 @@
+"""
+Coalescing write buffer for QR-scan attendance INSERTs
+
+When a class scans a QR code, dozens of students arrive within a few
+seconds and each scan used to cost its own INSERT round trip. Scans
+are queued in-process and a background flusher writes them with one
+multi-row INSERT every second (or as soon as 50 rows accumulate).
+Duplicate detection moves to a Redis set per session - SADD returns 0
+for a repeat scan - so the "already marked" answer needs no DB read;
+without Redis callers fall back to the usual SELECT-then-INSERT path.
+"""
+
+import logging
+import queue
+import threading
+from datetime import date
+
+from config import Config
+from database.database import DatabaseManager
+
+logger = logging.getLogger(__name__)
+
+FLUSH_INTERVAL = 1.0  # seconds between flushes when traffic is light
+MAX_BATCH = 50        # flush immediately once this many rows are queued
+
+try:
+    import redis
+    _redis = redis.from_url(Config.REDIS_URL)
+    _redis.ping()
+except Exception as e:
+    logger.warning(f"Attendance buffer dedup using database fallback ({e})")
+    _redis = None
+
+# INSERT IGNORE: the Redis set only dedups within (user, subject) for a
+# session, so a student already marked through another path (face, manual)
+# still reaches the flush. A plain INSERT would abort the whole multi-row
+# statement on the unique_attendance key and drop every other row in the
+# batch with it.
+INSERT_SQL = '''
+    INSERT IGNORE INTO attendance
+    (user_id, faculty_id, attendance_date, attendance_time,
+     subject, session_type, marked_by_face, marked_by_qr, qr_session_id, status)
+    VALUES (%s, %s, CURDATE(), CURTIME(), %s, %s, TRUE, TRUE, %s, 'P')
+'''
+
+class AttendanceBuffer:
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def available(self):
+        """Buffered writes need Redis for the duplicate check"""
+        return _redis is not None
+
+    def already_marked(self, user_id, subject, qr_session_id):
+        """Record the scan in the session's Redis set; True on a repeat.
+
+        Returns None when Redis cannot answer, in which case the caller
+        must use its database duplicate check instead.
+        """
+        if _redis is None:
+            return None
+        try:
+            key = f"att:{date.today().isoformat()}:{qr_session_id}"
+            added = _redis.sadd(key, f"{user_id}:{subject}")
+            _redis.expire(key, 86400)
+            return added == 0
+        except Exception as e:
+            logger.warning(f"Attendance dedup check failed: {e}")
+            return None
+
+    def scanned_count(self, qr_session_id):
+        """Number of distinct scans recorded for a session today.
+
+        SCARD on the dedup set answers the faculty poll without any
+        database touch; None when Redis is unavailable.
+        """
+        if _redis is None:
+            return None
+        try:
+            return _redis.scard(f"att:{date.today().isoformat()}:{qr_session_id}")
+        except Exception as e:
+            logger.warning(f"Attendance scan count failed: {e}")
+            return None
+
+    def add(self, user_id, faculty_id, subject, session_type, qr_session_id):
+        """Queue one attendance row for the next flush"""
+        self._start()
+        self._queue.put((user_id, faculty_id, subject, session_type, qr_session_id))
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+
+    def _drain(self):
+        """Block up to FLUSH_INTERVAL for rows, coalescing up to MAX_BATCH"""
+        rows = []
+        try:
+            rows.append(self._queue.get(timeout=FLUSH_INTERVAL))
+            while len(rows) < MAX_BATCH:
+                rows.append(self._queue.get_nowait())
+        except queue.Empty:
+            pass
+        return rows
+
+    def _run(self):
+        db = DatabaseManager()
+        while True:
+            rows = self._drain()
+            if not rows:
+                continue
+            try:
+                written = db.execute_many(INSERT_SQL, rows)
+                if written is None:
+                    # Batch failed (connection drop, bad row, ...). Retry
+                    # each row on its own so one poison row can't take the
+                    # other 49 scans down with it.
+                    for row in rows:
+                        if db.execute_query(INSERT_SQL, row) is None:
+                            logger.error(f"Attendance row dropped after retry: {row}")
+            except Exception as e:
+                logger.exception("Attendance flush error: %s", e)
+
+# Shared buffer instance
+attendance_buffer = AttendanceBuffer()
@@ -0,0 +1,76 @@
+"""
+Server-side store for the admin OTP login state
+
+The OTP flow used to park the admin's identifier, password and mobile
+number in the Flask session between the send and verify steps - which
+put the plaintext password in the cookie and inflated every request's
+sign/verify cost. The state now lives under an opaque nonce with a
+short TTL (Redis when available, an in-process dict otherwise); only
+the nonce travels in the cookie.
+"""
+
+import json
+import logging
+import secrets
+import threading
+import time
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+OTP_STATE_TTL = 300  # seconds before a pending OTP login expires
+
+try:
+    import redis
+    _redis = redis.from_url(Config.REDIS_URL)
+    _redis.ping()
+except Exception as e:
+    logger.warning(f"OTP store using in-process fallback ({e})")
+    _redis = None
+
+class OtpStore:
+    def __init__(self, ttl=OTP_STATE_TTL):
+        self.ttl = ttl
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def put(self, data):
+        """Store pending OTP login state, returning its nonce"""
+        nonce = secrets.token_urlsafe(16)
+        if _redis is not None:
+            _redis.setex(f'otp:{nonce}', self.ttl, json.dumps(data))
+        else:
+            with self._lock:
+                self._entries[nonce] = (data, time.monotonic() + self.ttl)
+        return nonce
+
+    def get(self, nonce):
+        """Return the state for a nonce, or None if expired/unknown"""
+        if not nonce:
+            return None
+        if _redis is not None:
+            raw = _redis.get(f'otp:{nonce}')
+            return json.loads(raw) if raw else None
+        with self._lock:
+            entry = self._entries.get(nonce)
+            if not entry:
+                return None
+            data, expires_at = entry
+            if time.monotonic() > expires_at:
+                del self._entries[nonce]
+                return None
+            return data
+
+    def delete(self, nonce):
+        """Drop the state once the flow completes or is abandoned"""
+        if not nonce:
+            return
+        if _redis is not None:
+            _redis.delete(f'otp:{nonce}')
+        else:
+            with self._lock:
+                self._entries.pop(nonce, None)
+
+# Shared store instance
+otp_store = OtpStore()
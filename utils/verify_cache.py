@@ -0,0 +1,66 @@
+"""
+In-memory TTL cache for password verification results
+
+Password hashing is deliberately slow (tens to hundreds of ms per
+verify), and the admin OTP flow authenticates the same credentials
+twice. Caching the verified user for a short window turns the repeat
+verification into a dict lookup. Entries are keyed by an HMAC of the
+credentials under the app secret - plaintext passwords are never
+stored.
+"""
+
+import hashlib
+import hmac
+import threading
+import time
+
+from config import Config
+
+class VerifyCache:
+    def __init__(self, ttl=300, max_entries=2048):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def _key(self, identifier, password):
+        password_digest = hashlib.sha256(password.encode('utf-8')).hexdigest()
+        return hmac.new(
+            Config.SECRET_KEY.encode('utf-8'),
+            f"{identifier}\0{password_digest}".encode('utf-8'),
+            'sha256'
+        ).digest()
+
+    def get(self, identifier, password):
+        """Return the cached user dict for these credentials, or None"""
+        key = self._key(identifier, password)
+        with self._lock:
+            entry = self._entries.get(key)
+            if not entry:
+                return None
+            user, expires_at = entry
+            if time.monotonic() > expires_at:
+                del self._entries[key]
+                return None
+            return user
+
+    def put(self, identifier, password, user):
+        """Cache a successful verification result"""
+        key = self._key(identifier, password)
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                self._entries.clear()
+            self._entries[key] = (user, time.monotonic() + self.ttl)
+
+    def invalidate(self, user_id):
+        """Drop cached entries for a user (call on password change)"""
+        with self._lock:
+            stale = [
+                key for key, (user, _) in self._entries.items()
+                if user.get('id') == user_id
+            ]
+            for key in stale:
+                del self._entries[key]
+
+# Shared cache instance
+verify_cache = VerifyCache()